@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT, and how long the writer waits to fill a batch
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.05
+# Producers wait once this many rows are pending instead of growing memory without bound
+AUDIT_QUEUE_MAX = 10_000
+
+_queue: Optional[asyncio.Queue] = None
+_writer: Optional[asyncio.Task] = None
+
+def _write_batch(rows: List[dict]):
+    db = SessionLocal()
+    try:
+        db.execute(insert(AuditLog), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Dropped %d buffered audit rows", len(rows))
+    finally:
+        db.close()
+
+async def _drain():
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _queue.get()]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL_SECONDS
+        try:
+            while len(batch) < AUDIT_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Shutting down mid-batch; keep what was already taken off the queue
+            _write_batch(batch)
+            raise
+        await loop.run_in_executor(None, _write_batch, batch)
+
+def start_audit_writer():
+    global _queue, _writer
+    _queue = asyncio.Queue(maxsize=AUDIT_QUEUE_MAX)
+    _writer = asyncio.get_running_loop().create_task(_drain())
+
+async def stop_audit_writer():
+    """Cancel the writer and flush whatever is still queued"""
+    global _queue, _writer
+    if _writer is None:
+        return
+    _writer.cancel()
+    try:
+        await _writer
+    except asyncio.CancelledError:
+        pass
+    pending = []
+    while not _queue.empty():
+        pending.append(_queue.get_nowait())
+    if pending:
+        await asyncio.get_running_loop().run_in_executor(None, _write_batch, pending)
+    _queue = _writer = None
+
+async def enqueue_audit_row(db: Session, row: dict):
+    """Buffer a loss-tolerant audit row; many rows then share one INSERT and one commit
+
+    Only for rows nothing reads back within the request. Without a running writer
+    (app not started through its lifespan) the row is written straight away on db.
+    """
+    if _queue is None:
+        db.execute(insert(AuditLog), [row])
+        db.commit()
+        return
+    await _queue.put(row)
@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+import os
+
+@dataclass(frozen=True)
+class Settings:
+    database_url: str
+    sql_echo: bool
+    run_migrations: bool
+    cors_origins: Tuple[str, ...]
+    secret_key: str
+    access_token_expire_minutes: int
+    token_cache_ttl_seconds: int
+    bcrypt_rounds: int
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout: int
+    db_pool_recycle: int
+    db_external_pool: bool
+
+def _database_url() -> str:
+    # Check if Oracle configuration is provided
+    oracle_user = os.getenv("ORACLE_USER")
+    oracle_password = os.getenv("ORACLE_PASSWORD")
+    oracle_connect_string = os.getenv("ORACLE_CONNECT_STRING")
+
+    if oracle_user and oracle_password and oracle_connect_string:
+        # Oracle configuration
+        return f"oracle+cx_oracle://{oracle_user}:{oracle_password}@{oracle_connect_string}"
+    # Fallback to SQLite
+    return os.getenv("DATABASE_URL", "sqlite:///./test.db")
+
+@lru_cache(maxsize=1)
+def settings() -> Settings:
+    """Environment-backed configuration, read and parsed once per process"""
+    return Settings(
+        database_url=_database_url(),
+        # Statement logging is opt-in; logging every query is too expensive for normal runs
+        sql_echo=os.getenv("SQL_ECHO") == "1",
+        run_migrations=os.getenv("RUN_MIGRATIONS") == "1",
+        cors_origins=tuple(
+            origin.strip() for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+        ),
+        secret_key=os.getenv("SECRET_KEY", "your-secret-key-change-in-production"),
+        access_token_expire_minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+        token_cache_ttl_seconds=int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "30")),
+        # Each step doubles hashing cost; 12 is passlib's default
+        bcrypt_rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+        # Keep (pool_size + max_overflow) * workers below the server's connection limit
+        db_pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        db_pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        db_pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        # Set when a server-side pooler (PgBouncer, Oracle DRCP) multiplexes connections
+        db_external_pool=os.getenv("DB_EXTERNAL_POOL") == "1",
+    )
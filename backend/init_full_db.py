@@ -6,9 +6,8 @@ Creates all tables and seeds with test data for both SQLite and Oracle
 
 import os
 import sys
-from datetime import datetime, timedelta
+from datetime import timedelta
 from passlib.context import CryptContext
-import uuid
 
 # Add the backend directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -16,8 +15,10 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from database import engine, Base, get_db, DATABASE_URL
 from models import (
     Tenant, User, Game, JobRole, CandidateProfile, 
-    Assessment, AssessmentItem, Report, BlacklistedToken, AuditLog
+    Assessment, AssessmentItem, Report, BlacklistedToken, AuditLog,
+    generate_id, utcnow
 )
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 
 # Password hashing
@@ -49,14 +50,22 @@ def init_database():
             
             print("Seeding database with test data...")
             
+            # One timestamp for the whole seed so related rows line up exactly
+            now = utcnow()
+            
+            # The whole seed runs as one transaction: rows are inserted in dependency
+            # order and committed once at the end
+            if DATABASE_URL.startswith("oracle"):
+                # Check deferrable constraints once at commit instead of per statement
+                db.execute(text("ALTER SESSION SET CONSTRAINTS = DEFERRED"))
+            
             # 1. Create default tenant
-            default_tenant = Tenant(
-                id=str(uuid.uuid4()),
-                name="CogniHire Demo",
-                subdomain="demo"
-            )
-            db.add(default_tenant)
-            db.flush()  # Get the ID
+            default_tenant = {
+                "id": generate_id(),
+                "name": "CogniHire Demo",
+                "subdomain": "demo"
+            }
+            db.execute(insert(Tenant), [default_tenant])
             
             # 2. Create job roles
             job_roles = [
@@ -94,35 +103,33 @@ def init_database():
                 }
             ]
             
-            created_job_roles = []
-            for role_data in job_roles:
-                job_role = JobRole(
-                    id=str(uuid.uuid4()),
-                    tenant_id=default_tenant.id,
-                    title=role_data["title"],
-                    description=role_data["description"],
-                    traits_json=role_data["traits_json"],
-                    config_json={"assessment_duration": 30, "max_attempts": 3}
-                )
-                db.add(job_role)
-                created_job_roles.append(job_role)
-            
-            db.flush()  # Get job role IDs
+            # IDs are generated up front so dependent rows can reference them without a flush
+            created_job_roles = [
+                {
+                    "id": generate_id(),
+                    "tenant_id": default_tenant["id"],
+                    "title": role_data["title"],
+                    "description": role_data["description"],
+                    "traits_json": role_data["traits_json"],
+                    "config_json": {"assessment_duration": 30, "max_attempts": 3}
+                } for role_data in job_roles
+            ]
+            db.execute(insert(JobRole), created_job_roles)
             
             # 3. Create admin user
-            admin_user = User(
-                id=str(uuid.uuid4()),
-                tenant_id=default_tenant.id,
-                email="admin@cognihire.com",
-                username="admin",
-                full_name="System Administrator",
-                password_hash=hash_password("admin123"),
-                role="ADMIN",
-                is_active=True,
-                mfa_enabled=False,
-                created_at=datetime.utcnow()
-            )
-            db.add(admin_user)
+            admin_user = {
+                "id": generate_id(),
+                "tenant_id": default_tenant["id"],
+                "email": "admin@cognihire.com",
+                "username": "admin",
+                "full_name": "System Administrator",
+                "password_hash": hash_password("admin123"),
+                "role": "ADMIN",
+                "job_role_id": None,
+                "is_active": True,
+                "mfa_enabled": False,
+                "created_at": now
+            }
             
             # 4. Create candidate users
             candidates_data = [
@@ -156,25 +163,29 @@ def init_database():
                 }
             ]
             
+            # bcrypt is deliberately slow, so hash each distinct seed password only once
+            password_hashes = {
+                password: hash_password(password)
+                for password in {candidate_data["password"] for candidate_data in candidates_data}
+            }
+            
             created_candidates = []
             for candidate_data in candidates_data:
-                candidate = User(
-                    id=str(uuid.uuid4()),
-                    tenant_id=default_tenant.id,
-                    email=candidate_data["email"],
-                    username=candidate_data["username"],
-                    full_name=candidate_data["full_name"],
-                    password_hash=hash_password(candidate_data["password"]),
-                    role="CANDIDATE",
-                    job_role_id=candidate_data["job_role"].id,
-                    is_active=True,
-                    mfa_enabled=False,
-                    created_at=datetime.utcnow()
-                )
-                db.add(candidate)
-                created_candidates.append(candidate)
+                created_candidates.append({
+                    "id": generate_id(),
+                    "tenant_id": default_tenant["id"],
+                    "email": candidate_data["email"],
+                    "username": candidate_data["username"],
+                    "full_name": candidate_data["full_name"],
+                    "password_hash": password_hashes[candidate_data["password"]],
+                    "role": "CANDIDATE",
+                    "job_role_id": candidate_data["job_role"]["id"],
+                    "is_active": True,
+                    "mfa_enabled": False,
+                    "created_at": now
+                })
             
-            db.flush()  # Get candidate IDs
+            db.execute(insert(User), [admin_user] + created_candidates)
             
             # 5. Create games
             games = [
@@ -212,69 +223,78 @@ def init_database():
                 }
             ]
             
-            created_games = []
-            for game_data in games:
-                game = Game(
-                    id=str(uuid.uuid4()),
-                    code=game_data["code"],
-                    title=game_data["title"],
-                    description=game_data["description"],
-                    base_config=game_data["base_config"]
-                )
-                db.add(game)
-                created_games.append(game)
+            created_games = [
+                {
+                    "id": generate_id(),
+                    "code": game_data["code"],
+                    "title": game_data["title"],
+                    "description": game_data["description"],
+                    "base_config": game_data["base_config"]
+                } for game_data in games
+            ]
+            db.execute(insert(Game), created_games)
             
-            db.flush()  # Get game IDs
+            # 6. Create sample assessments for the first 2 candidates
+            assessment_rows = [
+                {
+                    "id": generate_id(),
+                    "tenant_id": default_tenant["id"],
+                    "candidate_id": candidate["id"],
+                    "job_role_id": candidate["job_role_id"],
+                    "status": "COMPLETED" if i == 0 else "IN_PROGRESS",
+                    "started_at": now - timedelta(hours=2),
+                    "completed_at": now - timedelta(hours=1) if i == 0 else None,
+                    "total_score": 85.5 if i == 0 else None,
+                    "integrity_flags": {"violations": []} if i == 0 else None
+                } for i, candidate in enumerate(created_candidates[:2])
+            ]
             
-            # 6. Create sample assessments
-            for i, candidate in enumerate(created_candidates[:2]):  # Create assessments for first 2 candidates
-                assessment = Assessment(
-                    id=str(uuid.uuid4()),
-                    tenant_id=default_tenant.id,
-                    candidate_id=candidate.id,
-                    job_role_id=candidate.job_role_id,
-                    status="COMPLETED" if i == 0 else "IN_PROGRESS",
-                    started_at=datetime.utcnow() - timedelta(hours=2),
-                    completed_at=datetime.utcnow() - timedelta(hours=1) if i == 0 else None,
-                    total_score=85.5 if i == 0 else None,
-                    integrity_flags={"violations": []} if i == 0 else None
-                )
-                db.add(assessment)
-                db.flush()  # Get assessment ID
-                
-                # Create assessment items (games within the assessment)
-                for j, game in enumerate(created_games):
-                    item = AssessmentItem(
-                        id=str(uuid.uuid4()),
-                        assessment_id=assessment.id,
-                        game_id=game.id,
-                        order_index=j + 1,
-                        timer_seconds=300,  # 5 minutes
-                        server_started_at=datetime.utcnow() - timedelta(hours=2),
-                        server_deadline_at=datetime.utcnow() - timedelta(hours=1, minutes=55),
-                        status="SUBMITTED" if i == 0 else "PENDING",
-                        score=80 + (j * 5) if i == 0 else None,
-                        metrics_json={
-                            "accuracy": 0.85 + (j * 0.05),
-                            "avg_response_time": 1200 - (j * 100),
-                            "consistency": 0.9
-                        } if i == 0 else None,
-                        config_snapshot=game.base_config
-                    )
-                    db.add(item)
+            # Assessment items (games within each assessment), built flat for one executemany
+            item_rows = [
+                {
+                    "id": generate_id(),
+                    "assessment_id": assessment["id"],
+                    "game_id": game["id"],
+                    "order_index": j + 1,
+                    "timer_seconds": 300,  # 5 minutes
+                    "server_started_at": now - timedelta(hours=2),
+                    "server_deadline_at": now - timedelta(hours=1, minutes=55),
+                    "status": "SUBMITTED" if i == 0 else "PENDING",
+                    "score": 80 + (j * 5) if i == 0 else None,
+                    "metrics_json": {
+                        "accuracy": 0.85 + (j * 0.05),
+                        "avg_response_time": 1200 - (j * 100),
+                        "consistency": 0.9
+                    } if i == 0 else None,
+                    "config_snapshot": game["base_config"]
+                }
+                for i, assessment in enumerate(assessment_rows)
+                for j, game in enumerate(created_games)
+            ]
+            
+            db.execute(insert(Assessment), assessment_rows)
+            db.execute(insert(AssessmentItem), item_rows)
             
-            # Commit all changes
+            # Commit all changes in a single round-trip
             db.commit()
+
+            if DATABASE_URL.startswith("oracle"):
+                # Refresh optimizer statistics so the new composite indexes get picked
+                for table in ("USERS", "JOB_ROLES", "ASSESSMENTS", "ASSESSMENT_ITEMS"):
+                    db.execute(
+                        text("BEGIN DBMS_STATS.GATHER_TABLE_STATS(ownname => USER, tabname => :t); END;"),
+                        {"t": table}
+                    )
             
             print("✅ Database initialized successfully!")
             print("\n📊 Created test data:")
-            print(f"  - 1 Tenant: {default_tenant.name}")
-            print(f"  - 4 Job Roles: {', '.join([jr.title for jr in created_job_roles])}")
+            print(f"  - 1 Tenant: {default_tenant['name']}")
+            print(f"  - 4 Job Roles: {', '.join([jr['title'] for jr in created_job_roles])}")
             print(f"  - 1 Admin User: admin/admin123")
             print(f"  - 4 Candidate Users:")
             for candidate_data in candidates_data:
                 print(f"    • {candidate_data['username']}/password123 ({candidate_data['full_name']})")
-            print(f"  - 3 Games: {', '.join([g.title for g in created_games])}")
+            print(f"  - 3 Games: {', '.join([g['title'] for g in created_games])}")
             print(f"  - 2 Sample Assessments")
             print("\n🎯 Ready to test!")
             
@@ -1,55 +1,121 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-from routers import auth, users, assessments, games
-import os
-
-# Import new routers
-from routers.job_roles import router as job_roles_router
-from routers.candidates import router as candidates_router
-from routers.telemetry import router as telemetry_router
-from routers.reports import router as reports_router
-from routers.admin import router as admin_router
-
-# Try to create database tables
-try:
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully")
-except Exception as e:
-    print(f"Warning: Could not create database tables: {e}")
-    print("Make sure Oracle database is properly configured")
-
-app = FastAPI(
-    title="CogniHire API",
-    version="1.0.0",
-    description="Cognitive Assessment Platform API"
-)
+from fastapi.responses import ORJSONResponse
+from config import settings
+from pagination import NEXT_CURSOR_HEADER
+import importlib
 
-# CORS middleware - configurable for different environments
-cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[origin.strip() for origin in cors_origins],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# (module, prefix, tag) for every API router; modules are imported inside create_app()
+ROUTERS = (
+    ("routers.auth", "/auth", "Authentication"),
+    ("routers.users", "/users", "Users"),
+    ("routers.assessments", "/assessments", "Assessments"),
+    ("routers.games", "/games", "Games"),
+    ("routers.job_roles", "/job-roles", "Job Roles"),
+    ("routers.candidates", "/candidates", "Candidates"),
+    ("routers.telemetry", "/telemetry", "Telemetry"),
+    ("routers.reports", "/reports", "Reports"),
+    ("routers.admin", "/admin", "Admin"),
 )
 
-# Include routers
-app.include_router(auth, prefix="/auth", tags=["Authentication"])
-app.include_router(users, prefix="/users", tags=["Users"])
-app.include_router(assessments, prefix="/assessments", tags=["Assessments"])
-app.include_router(games, prefix="/games", tags=["Games"])
-app.include_router(job_roles_router, prefix="/job-roles", tags=["Job Roles"])
-app.include_router(candidates_router, prefix="/candidates", tags=["Candidates"])
-app.include_router(telemetry_router, prefix="/telemetry", tags=["Telemetry"])
-app.include_router(reports_router, prefix="/reports", tags=["Reports"])
-app.include_router(admin_router, prefix="/admin", tags=["Admin"])
-
-@app.get("/")
-async def root():
-    return {"message": "CogniHire API"}
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+def create_app() -> FastAPI:
+    """Build the configured application; usable with `uvicorn --factory main:create_app`"""
+    app = FastAPI(
+        title="CogniHire API",
+        version="1.0.0",
+        description="Cognitive Assessment Platform API",
+        # orjson encodes the (already jsonable_encoder'd) payloads several times faster than json
+        default_response_class=ORJSONResponse
+    )
+
+    @app.on_event("startup")
+    async def _maybe_init():
+        # Schema creation is opt-in so every worker boot doesn't query the data dictionary;
+        # for a local database run init_full_db.py once instead
+        if settings().run_migrations:
+            from database import engine, Base
+            from sqlalchemy import inspect, text
+            Base.metadata.create_all(bind=engine)
+            # create_all skips tables that already exist: assessments tables made before
+            # created_at existed get the column, backfilled, before the indexes that use it
+            assessment_columns = {column["name"] for column in inspect(engine).get_columns("assessments")}
+            if "created_at" not in assessment_columns:
+                created_at_type = Base.metadata.tables["assessments"].c.created_at.type.compile(dialect=engine.dialect)
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE assessments ADD created_at {created_at_type}"))
+                    conn.execute(text(
+                        "UPDATE assessments SET created_at = COALESCE(started_at, CURRENT_TIMESTAMP) "
+                        "WHERE created_at IS NULL"
+                    ))
+            # Add any indexes existing tables are missing
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=engine, checkfirst=True)
+            # Roles are stored uppercase; normalize rows written before that was enforced
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE users SET role = UPPER(role) WHERE role <> UPPER(role)"))
+
+    @app.on_event("startup")
+    async def _bootstrap_default_tenant():
+        # Resolve (or create) the default tenant once per worker so register and
+        # candidate creation find its id cached and commit only their own rows
+        from database import SessionLocal
+        from sqlalchemy.exc import SQLAlchemyError
+        from routers.auth import get_default_tenant_id
+        db = SessionLocal()
+        try:
+            get_default_tenant_id(db)
+        except SQLAlchemyError:
+            # Schema not there yet; the first create request bootstraps it instead
+            db.rollback()
+        finally:
+            db.close()
+
+    @app.on_event("startup")
+    async def _start_audit_writer():
+        # Batches loss-tolerant audit rows such as heartbeats into shared INSERTs
+        from audit_queue import start_audit_writer
+        start_audit_writer()
+
+    @app.on_event("shutdown")
+    async def _stop_audit_writer():
+        from audit_queue import stop_audit_writer
+        await stop_audit_writer()
+
+    # CORS middleware - configurable for different environments
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(settings().cors_origins),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
+
+    # Include routers
+    for module_name, prefix, tag in ROUTERS:
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, prefix=prefix, tags=[tag])
+
+    @app.get("/")
+    async def root():
+        return {"message": "CogniHire API"}
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    return app
+
+_app = None
+
+def __getattr__(name):
+    # `uvicorn main:app` still works, but the app (and with it every router, the
+    # models and the JWT stack) is only built on first access, not on `import main`
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
@@ -1,15 +1,35 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON, DECIMAL, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON, DECIMAL, UUID, Index, CheckConstraint
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from database import Base, DATABASE_URL
+from datetime import datetime, timezone
+import os
+import time
 import uuid
 
-# Determine ID column type based on database
+def generate_id() -> str:
+    """Generate a time-ordered UUIDv7 string for a new primary key"""
+    # 48-bit ms timestamp first so new keys land on the right edge of the PK index
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76                          # version 7
+        | (rand >> 62 & 0xFFF) << 64         # rand_a
+        | 0b10 << 62                         # RFC 4122 variant
+        | rand & 0x3FFFFFFFFFFFFFFF          # rand_b
+    )
+    return str(uuid.UUID(int=value))
+
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime, the form every DateTime column stores"""
+    # datetime.utcnow() is deprecated; same value without the deprecated call
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# Ids are canonical 36-char UUID strings on every backend; a bounded
+# VARCHAR keeps PK/FK index entries compact and is required by Oracle
 def get_id_column():
-    if DATABASE_URL.startswith("oracle"):
-        return Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    else:
-        return Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    return Column(String(36), primary_key=True, default=generate_id)
 
 def get_string_column(length=None):
     if DATABASE_URL.startswith("oracle") and length:
@@ -17,6 +37,11 @@ def get_string_column(length=None):
     else:
         return String(length) if length else String
 
+# Allowed values for the string enum columns; frozensets give O(1) membership checks
+USER_ROLES = frozenset({"ADMIN", "CANDIDATE"})
+ASSESSMENT_STATUSES = frozenset({"NOT_STARTED", "IN_PROGRESS", "COMPLETED", "EXPIRED", "CANCELLED"})
+ACTIVE_ASSESSMENT_STATUSES = ("NOT_STARTED", "IN_PROGRESS")
+
 class Tenant(Base):
     __tablename__ = "tenants"
 
@@ -27,6 +52,12 @@ class Tenant(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_tenant_role", "tenant_id", "role"),
+        Index("ix_users_role_active", "role", "is_active"),
+        Index("ix_users_created_id", "created_at", "id"),
+        CheckConstraint("role IN ('ADMIN', 'CANDIDATE')", name="ck_users_role"),
+    )
 
     id = get_id_column()
     tenant_id = Column(String(36), ForeignKey("tenants.id"))
@@ -34,7 +65,7 @@ class User(Base):
     username = Column(get_string_column(64), unique=True, nullable=False)
     full_name = Column(get_string_column(200))
     password_hash = Column(get_string_column(255), nullable=False)
-    role = Column(get_string_column(16), nullable=False)  # ADMIN, CANDIDATE
+    role = Column(get_string_column(16), nullable=False)  # ADMIN, CANDIDATE (always stored uppercase)
     job_role_id = Column(String(36), ForeignKey("job_roles.id"))
     is_active = Column(Boolean, default=True)
     mfa_enabled = Column(Boolean, default=False)
@@ -45,11 +76,19 @@ class User(Base):
     tenant = relationship("Tenant")
     job_role = relationship("JobRole")
     assessments = relationship("Assessment", back_populates="candidate")
+    candidate_profile = relationship(
+        "CandidateProfile", back_populates="user", uselist=False, cascade="all, delete-orphan"
+    )
+
+    @validates("role")
+    def _normalize_role(self, key, value):
+        # Plain equality on role then matches every row and can use the b-tree indexes
+        return value.upper() if value else value
 
 class Game(Base):
     __tablename__ = "games"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = get_id_column()
     code = Column(String(64), unique=True, nullable=False)
     title = Column(String(200))
     description = Column(Text)
@@ -60,9 +99,12 @@ class Game(Base):
 
 class JobRole(Base):
     __tablename__ = "job_roles"
+    __table_args__ = (
+        Index("ix_jobroles_tenant_created", "tenant_id", "created_at"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    tenant_id = Column(String, ForeignKey("tenants.id"))
+    id = get_id_column()
+    tenant_id = Column(String(36), ForeignKey("tenants.id"))
     title = Column(String(200), nullable=False)
     description = Column(Text)
     traits_json = Column(JSON)  # Cognitive traits required for this role
@@ -75,28 +117,39 @@ class JobRole(Base):
 
 class CandidateProfile(Base):
     __tablename__ = "candidate_profiles"
+    __table_args__ = (
+        Index("ix_candidate_profiles_job_role", "job_role_id"),
+    )
 
-    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     full_name = Column(String(200))
-    job_role_id = Column(String, ForeignKey("job_roles.id"))
+    job_role_id = Column(String(36), ForeignKey("job_roles.id"))
     metadata_json = Column(JSON)
 
     # Relationships
-    user = relationship("User")
+    user = relationship("User", back_populates="candidate_profile")
     job_role = relationship("JobRole")
 
 class Assessment(Base):
     __tablename__ = "assessments"
+    __table_args__ = (
+        Index("ix_assessments_tenant_status_created", "tenant_id", "status", "created_at"),
+        # Candidate filters and /current (candidate + status IN, newest first) read this in index order
+        Index("ix_assessments_candidate_status_created", "candidate_id", "status", "created_at"),
+        Index("ix_assessments_job_role", "job_role_id"),
+        Index("ix_assessments_created_id", "created_at", "id"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    tenant_id = Column(String, ForeignKey("tenants.id"))
-    candidate_id = Column(String, ForeignKey("users.id"))
-    job_role_id = Column(String, ForeignKey("job_roles.id"))
+    id = get_id_column()
+    tenant_id = Column(String(36), ForeignKey("tenants.id"))
+    candidate_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"))
+    job_role_id = Column(String(36), ForeignKey("job_roles.id"))
     status = Column(String(16), default="NOT_STARTED")  # NOT_STARTED, IN_PROGRESS, COMPLETED, EXPIRED, CANCELLED
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     total_score = Column(DECIMAL(9,3))
     integrity_flags = Column(JSON)
+    created_at = Column(DateTime, default=func.now())
 
     # Relationships
     tenant = relationship("Tenant")
@@ -104,12 +157,27 @@ class Assessment(Base):
     job_role = relationship("JobRole", back_populates="assessments")
     items = relationship("AssessmentItem", back_populates="assessment")
 
+    @property
+    def candidate_name(self):
+        """Candidate profile name, falling back to the username"""
+        if self.candidate is None:
+            return None
+        profile = self.candidate.candidate_profile
+        return profile.full_name if profile else self.candidate.username
+
+    @property
+    def job_role_title(self):
+        return self.job_role.title if self.job_role else None
+
 class AssessmentItem(Base):
     __tablename__ = "assessment_items"
+    __table_args__ = (
+        Index("ix_assessment_items_assessment_order", "assessment_id", "order_index"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    assessment_id = Column(String, ForeignKey("assessments.id"))
-    game_id = Column(String, ForeignKey("games.id"))
+    id = get_id_column()
+    assessment_id = Column(String(36), ForeignKey("assessments.id", ondelete="CASCADE"))
+    game_id = Column(String(36), ForeignKey("games.id"))
     order_index = Column(Integer)
     timer_seconds = Column(Integer)
     server_started_at = Column(DateTime)
@@ -126,8 +194,8 @@ class AssessmentItem(Base):
 class Report(Base):
     __tablename__ = "reports"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    assessment_id = Column(String, ForeignKey("assessments.id"))
+    id = get_id_column()
+    assessment_id = Column(String(36), ForeignKey("assessments.id"))
     storage_key = Column(String(512))
     created_at = Column(DateTime, default=func.now())
 
@@ -136,10 +204,14 @@ class Report(Base):
 
 class BlacklistedToken(Base):
     __tablename__ = "blacklisted_tokens"
+    __table_args__ = (
+        # Range scan for the expired-token cleanup sweep
+        Index("ix_blacklisted_tokens_expires_at", "expires_at"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = get_id_column()
     token_jti = Column(String(255), unique=True, nullable=False)  # JWT ID
-    user_id = Column(String, ForeignKey("users.id"))
+    user_id = Column(String(36), ForeignKey("users.id"))
     blacklisted_at = Column(DateTime, default=func.now())
     expires_at = Column(DateTime, nullable=False)
 
@@ -149,12 +221,12 @@ class BlacklistedToken(Base):
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    tenant_id = Column(String)
-    actor_user_id = Column(String)
+    id = get_id_column()
+    tenant_id = Column(String(36))
+    actor_user_id = Column(String(36))
     action = Column(String(128))
     target_type = Column(String(64))
-    target_id = Column(String)
+    target_id = Column(String(36))
     ip = Column(String(64))
     user_agent = Column(String(256))
     payload_json = Column(JSON)
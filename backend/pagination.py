@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Optional, Tuple
+import base64
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque cursor for a (created_at, id) keyset position"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_page(query, created_col, id_col, limit: int, cursor: Optional[str] = None, skip: int = 0):
+    """Newest-first page of query ordered on (created_at, id); returns (rows, next_cursor)
+
+    With a cursor the page starts right after it and walks the (created_at, id)
+    index, so deep pages cost the same as the first one. Without a cursor the
+    legacy skip offset still applies.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Expanded row-value comparison; Oracle has no (a, b) < (x, y)
+        query = query.filter(or_(
+            created_col < created_at,
+            and_(created_col == created_at, id_col < row_id)
+        ))
+    query = query.order_by(created_col.desc(), id_col.desc())
+    if skip and not cursor:
+        query = query.offset(skip)
+
+    # One extra row tells us whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
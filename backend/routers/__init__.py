@@ -1,4 +0,0 @@
-from .auth import router as auth
-from .users import router as users
-from .assessments import router as assessments
-from .games import router as games
\ No newline at end of file
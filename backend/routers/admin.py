@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload
+from sqlalchemy import case, delete, exists, func, or_, select, insert, update
+from sqlalchemy.exc import IntegrityError
 from database import get_db
-from models import User, Assessment, JobRole, CandidateProfile
-from routers.auth import get_current_admin_user
-from typing import Dict, Any
+from models import User, Assessment, AssessmentItem, JobRole, CandidateProfile, Report, BlacklistedToken, generate_id, utcnow
+from routers.auth import get_current_admin_user, invalidate_cached_user, invalidate_user_list_cache
+from routers.auth import get_password_hash_async
+from typing import Dict, Any, List
 from pydantic import BaseModel
-import uuid
-from passlib.context import CryptContext
+from cachetools import TTLCache
+import asyncio
+import threading
+import secrets
+from decimal import Decimal
+import orjson
 
 router = APIRouter()
 
@@ -18,8 +25,56 @@ class CreateCandidateRequest(BaseModel):
     full_name: str
     job_role_id: str = None
 
-# Password context for hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+MAX_CANDIDATE_BATCH = 100
+
+# Columns the admin PATCH endpoints may write
+CANDIDATE_PATCH_FIELDS = frozenset({"is_active", "full_name", "email"})
+JOB_ROLE_PATCH_FIELDS = frozenset({"title", "description", "traits_json", "config_json"})
+
+# Simple analysis - in a real app this would use AI/ML
+DEFAULT_JOB_ROLE_TRAITS = {
+    "cognitive_flexibility": {"required": True, "weight": 0.8},
+    "working_memory": {"required": True, "weight": 0.7},
+    "processing_speed": {"required": False, "weight": 0.6},
+    "attention_control": {"required": True, "weight": 0.9}
+}
+
+# Dashboard counters; admin dashboards poll this far more often than it changes.
+# The counts span all tenants, so a single entry serves every admin
+OVERVIEW_CACHE_TTL_SECONDS = 60
+_overview_cache = TTLCache(maxsize=1, ttl=OVERVIEW_CACHE_TTL_SECONDS)
+_overview_cache_lock = threading.Lock()
+
+# Rows per fetch / per flushed chunk for streamed list responses
+STREAM_BATCH_SIZE = 500
+
+def _orjson_default(value):
+    # Numeric columns come back as Decimal, which orjson doesn't encode natively
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+def _stream_json_array(rows):
+    """Encode an iterable of dicts as a JSON array, flushing every STREAM_BATCH_SIZE rows"""
+    chunk = [b"["]
+    for index, row in enumerate(rows):
+        if index:
+            chunk.append(b",")
+        chunk.append(orjson.dumps(row, default=_orjson_default))
+        if len(chunk) >= STREAM_BATCH_SIZE * 2:
+            yield b"".join(chunk)
+            chunk = []
+    chunk.append(b"]")
+    yield b"".join(chunk)
+
+def generate_temporary_password() -> str:
+    """Random temporary password from the OS CSPRNG (72 bits, 12 URL-safe chars)"""
+    return secrets.token_urlsafe(9)
+
+def invalidate_overview_cache():
+    """Drop cached overview counters after candidates, assessments or job roles change"""
+    with _overview_cache_lock:
+        _overview_cache.clear()
 
 @router.get("/analytics/overview")
 async def get_admin_analytics_overview(
@@ -28,47 +83,33 @@ async def get_admin_analytics_overview(
 ) -> Dict[str, Any]:
     """Get overview analytics for admin dashboard"""
     
-    # Get total candidates (users who are candidates - case insensitive)
-    total_candidates = db.query(User).filter(
-        func.lower(User.role) == 'candidate'
-    ).count()
-    
-    # Get active candidates
-    active_candidates = db.query(User).filter(
-        func.lower(User.role) == 'candidate',
-        User.is_active == True
-    ).count()
-    
-    # Get total assessments
-    total_assessments = db.query(Assessment).count()
-    
-    # Get completed assessments
-    completed_assessments = db.query(Assessment).filter(
-        Assessment.status == 'COMPLETED'
-    ).count()
-    
-    # Get total job roles
-    total_job_roles = db.query(JobRole).count()
-    
-    # Debug: Get all user roles to see what we have
-    all_roles = db.query(User.role).distinct().all()
-    print(f"Debug - All roles in database: {[role[0] for role in all_roles]}")
-    
-    return {
-        "total_candidates": total_candidates,
-        "active_candidates": active_candidates,
-        "total_assessments": total_assessments,
-        "completed_assessments": completed_assessments,
-        "total_job_roles": total_job_roles
-    }
+    with _overview_cache_lock:
+        cached = _overview_cache.get("overview")
+    if cached is not None:
+        return cached
+    
+    is_candidate = User.role == 'CANDIDATE'
+    
+    # All dashboard counters come back from a single SELECT of scalar subqueries
+    overview = db.execute(
+        select(
+            select(func.count(User.id)).where(is_candidate)
+                .scalar_subquery().label("total_candidates"),
+            select(func.count(User.id)).where(is_candidate, User.is_active == True)
+                .scalar_subquery().label("active_candidates"),
+            select(func.count(Assessment.id))
+                .scalar_subquery().label("total_assessments"),
+            select(func.count(Assessment.id)).where(Assessment.status == 'COMPLETED')
+                .scalar_subquery().label("completed_assessments"),
+            select(func.count(JobRole.id))
+                .scalar_subquery().label("total_job_roles")
+        )
+    ).one()
     
-    return {
-        "total_candidates": total_candidates,
-        "active_candidates": active_candidates,
-        "total_assessments": total_assessments,
-        "completed_assessments": completed_assessments,
-        "total_job_roles": total_job_roles
-    }
+    result = dict(overview._mapping)
+    with _overview_cache_lock:
+        _overview_cache["overview"] = result
+    return result
 
 @router.get("/candidates")
 async def get_admin_candidates(
@@ -78,45 +119,43 @@ async def get_admin_candidates(
 ):
     """Get all candidates for admin"""
     
+    # Per-candidate assessment totals, aggregated once and joined in
+    stats = (
+        select(
+            Assessment.candidate_id,
+            func.count(Assessment.id).label("assessment_count"),
+            func.sum(case((Assessment.status == 'COMPLETED', 1), else_=0)).label("completed_assessments")
+        )
+        .group_by(Assessment.candidate_id)
+        .subquery()
+    )
+    
     # Query for users who are candidates - case insensitive
-    query = db.query(User).filter(
-        func.lower(User.role) == 'candidate'
+    query = (
+        db.query(User, stats.c.assessment_count, stats.c.completed_assessments)
+        .outerjoin(stats, stats.c.candidate_id == User.id)
+        .options(joinedload(User.job_role), raiseload("*"))
+        .filter(User.role == 'CANDIDATE')
     )
     
     if is_active is not None:
         query = query.filter(User.is_active == is_active)
     
-    candidates = query.all()
-    
-    result = []
-    for candidate in candidates:
-        # Get job role info
-        job_role = None
-        if candidate.job_role_id:
-            job_role = db.query(JobRole).filter(JobRole.id == candidate.job_role_id).first()
-        
-        # Get assessment stats
-        assessment_count = db.query(Assessment).filter(Assessment.candidate_id == candidate.id).count()
-        completed_assessments = db.query(Assessment).filter(
-            Assessment.candidate_id == candidate.id,
-            Assessment.status == 'COMPLETED'
-        ).count()
-        
-        result.append({
+    return [
+        {
             "id": candidate.id,
             "username": candidate.username,
             "email": candidate.email,
             "full_name": candidate.full_name,
             "job_role_id": candidate.job_role_id,
-            "job_role_title": job_role.title if job_role else None,
+            "job_role_title": candidate.job_role.title if candidate.job_role else None,
             "is_active": candidate.is_active,
             "created_at": candidate.created_at.isoformat(),
             "last_login_at": candidate.last_login_at.isoformat() if candidate.last_login_at else None,
-            "assessment_count": assessment_count,
-            "completed_assessments": completed_assessments
-        })
-    
-    return result
+            "assessment_count": assessment_count or 0,
+            "completed_assessments": completed_assessments or 0
+        } for candidate, assessment_count, completed_assessments in query.all()
+    ]
 
 @router.post("/candidates")
 async def create_admin_candidate(
@@ -126,46 +165,49 @@ async def create_admin_candidate(
 ):
     """Create a new candidate"""
     
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == candidate_data.username).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username already exists")
-    
-    # Check if email already exists
-    existing_email = db.query(User).filter(User.email == candidate_data.email).first()
-    if existing_email:
+    # Check username and email uniqueness with one projected lookup
+    existing = db.query(User.username).filter(
+        or_(User.username == candidate_data.username, User.email == candidate_data.email)
+    ).first()
+    if existing:
+        if existing.username == candidate_data.username:
+            raise HTTPException(status_code=400, detail="Username already exists")
         raise HTTPException(status_code=400, detail="Email already exists")
     
-    # Validate job role if provided
+    # Validate job role if provided; only its title is needed for the response
+    job_role_title = None
     if candidate_data.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == candidate_data.job_role_id).first()
-        if not job_role:
+        job_role_title = db.query(JobRole.title).filter(JobRole.id == candidate_data.job_role_id).scalar()
+        if job_role_title is None:
             raise HTTPException(status_code=400, detail="Invalid job role ID")
     
     # Generate a temporary password (user will need to reset it)
-    temp_password = f"temp{uuid.uuid4().hex[:8]}"
-    hashed_password = pwd_context.hash(temp_password)
+    temp_password = generate_temporary_password()
+    # bcrypt is ~250 ms of CPU; hash on the threadpool so the event loop keeps serving
+    hashed_password = await get_password_hash_async(temp_password)
     
     # Create new user
     new_user = User(
-        id=str(uuid.uuid4()),
+        id=generate_id(),
         username=candidate_data.username,
         email=candidate_data.email,
         full_name=candidate_data.full_name,
         password_hash=hashed_password,
-        role='candidate',
+        role='CANDIDATE',
         job_role_id=candidate_data.job_role_id,
-        is_active=True
+        is_active=True,
+        created_at=utcnow()
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    # Get job role info for response
-    job_role = None
-    if new_user.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == new_user.job_role_id).first()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent create on the unique username/email columns
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already exists")
+    invalidate_overview_cache()
+    invalidate_user_list_cache()
     
     return {
         "id": new_user.id,
@@ -173,7 +215,7 @@ async def create_admin_candidate(
         "email": new_user.email,
         "full_name": new_user.full_name,
         "job_role_id": new_user.job_role_id,
-        "job_role_title": job_role.title if job_role else None,
+        "job_role_title": job_role_title,
         "is_active": new_user.is_active,
         "created_at": new_user.created_at.isoformat(),
         "last_login_at": None,
@@ -182,6 +224,88 @@ async def create_admin_candidate(
         "temporary_password": temp_password  # Only returned on creation
     }
 
+@router.post("/candidates/batch")
+async def create_admin_candidates_batch(
+    candidates_data: List[CreateCandidateRequest],
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """Create several candidates in one request and one transaction"""
+    
+    if not candidates_data:
+        raise HTTPException(status_code=400, detail="No candidates provided")
+    if len(candidates_data) > MAX_CANDIDATE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CANDIDATE_BATCH} candidates per batch")
+    
+    usernames = [c.username for c in candidates_data]
+    emails = [c.email for c in candidates_data]
+    if len(set(usernames)) != len(usernames) or len(set(emails)) != len(emails):
+        raise HTTPException(status_code=400, detail="Duplicate username or email in batch")
+    
+    # One IN lookup for collisions with existing users
+    existing = db.query(User.username, User.email).filter(
+        or_(User.username.in_(usernames), User.email.in_(emails))
+    ).all()
+    if existing:
+        taken = sorted({row.username for row in existing if row.username in usernames} |
+                       {row.email for row in existing if row.email in emails})
+        raise HTTPException(status_code=400, detail=f"Already exists: {', '.join(taken)}")
+    
+    # One IN lookup validating every referenced job role
+    job_role_ids = {c.job_role_id for c in candidates_data if c.job_role_id}
+    job_role_titles = {}
+    if job_role_ids:
+        job_role_titles = dict(db.query(JobRole.id, JobRole.title).filter(JobRole.id.in_(job_role_ids)).all())
+        if len(job_role_titles) != len(job_role_ids):
+            raise HTTPException(status_code=400, detail="Invalid job role ID")
+    
+    # bcrypt releases the GIL, so hashing on the pool's threads runs in parallel across cores
+    temp_passwords = [generate_temporary_password() for _ in candidates_data]
+    hashed_passwords = await asyncio.gather(
+        *[get_password_hash_async(password) for password in temp_passwords]
+    )
+    
+    now = utcnow()
+    rows = [
+        {
+            "id": generate_id(),
+            "username": c.username,
+            "email": c.email,
+            "full_name": c.full_name,
+            "password_hash": hashed_password,
+            "role": 'CANDIDATE',
+            "job_role_id": c.job_role_id,
+            "is_active": True,
+            "created_at": now
+        } for c, hashed_password in zip(candidates_data, hashed_passwords)
+    ]
+    
+    try:
+        db.execute(insert(User), rows)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already exists")
+    invalidate_overview_cache()
+    invalidate_user_list_cache()
+    
+    return [
+        {
+            "id": row["id"],
+            "username": row["username"],
+            "email": row["email"],
+            "full_name": row["full_name"],
+            "job_role_id": row["job_role_id"],
+            "job_role_title": job_role_titles.get(row["job_role_id"]),
+            "is_active": True,
+            "created_at": now.isoformat(),
+            "last_login_at": None,
+            "assessment_count": 0,
+            "completed_assessments": 0,
+            "temporary_password": temp_password  # Only returned on creation
+        } for row, temp_password in zip(rows, temp_passwords)
+    ]
+
 @router.get("/candidates/{candidate_id}")
 async def get_admin_candidate(
     candidate_id: str,
@@ -190,25 +314,21 @@ async def get_admin_candidate(
 ):
     """Get a specific candidate for admin"""
     
-    candidate = db.query(User).filter(
+    candidate = db.query(User).options(joinedload(User.job_role), raiseload("*")).filter(
         User.id == candidate_id,
-        User.role != 'admin'
+        User.role != 'ADMIN'
     ).first()
     
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    # Get job role info
-    job_role = None
-    if candidate.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == candidate.job_role_id).first()
+    job_role = candidate.job_role
     
-    # Get assessment stats
-    assessment_count = db.query(Assessment).filter(Assessment.candidate_id == candidate.id).count()
-    completed_assessments = db.query(Assessment).filter(
-        Assessment.candidate_id == candidate.id,
-        Assessment.status == 'COMPLETED'
-    ).count()
+    # Get assessment stats; both counts come from one aggregate
+    assessment_count, completed_assessments = db.query(
+        func.count(Assessment.id),
+        func.sum(case((Assessment.status == 'COMPLETED', 1), else_=0))
+    ).filter(Assessment.candidate_id == candidate.id).one()
     
     return {
         "id": candidate.id,
@@ -221,7 +341,7 @@ async def get_admin_candidate(
         "created_at": candidate.created_at.isoformat(),
         "last_login_at": candidate.last_login_at.isoformat() if candidate.last_login_at else None,
         "assessment_count": assessment_count,
-        "completed_assessments": completed_assessments
+        "completed_assessments": completed_assessments or 0
     }
 
 @router.patch("/candidates/{candidate_id}")
@@ -233,21 +353,29 @@ async def update_admin_candidate(
 ):
     """Update a candidate (admin only)"""
     
-    candidate = db.query(User).filter(
-        User.id == candidate_id,
-        User.role != 'admin'
-    ).first()
+    allowed = {k: v for k, v in update_data.items() if k in CANDIDATE_PATCH_FIELDS}
+    if not allowed:
+        raise HTTPException(status_code=400, detail="No updatable fields provided")
+    
+    # Single UPDATE ... WHERE; no row load or ORM change tracking
+    try:
+        result = db.execute(
+            update(User)
+            .where(User.id == candidate_id, User.role != 'ADMIN')
+            .values(**allowed)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except IntegrityError:
+        # The only unique column candidates can PATCH is email
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email already exists")
     
-    if not candidate:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    # Update allowed fields
-    for field, value in update_data.items():
-        if hasattr(candidate, field) and field in ['is_active', 'full_name', 'email']:
-            setattr(candidate, field, value)
-    
-    db.commit()
-    db.refresh(candidate)
+    invalidate_overview_cache()
+    invalidate_cached_user(candidate_id)
     
     return {"message": "Candidate updated successfully"}
 
@@ -259,20 +387,26 @@ async def delete_admin_candidate(
 ):
     """Delete a candidate (admin only)"""
     
-    candidate = db.query(User).filter(
-        User.id == candidate_id,
-        User.role != 'admin'
-    ).first()
-    
-    if not candidate:
+    # Set-based deletes, no rows loaded into the session. Dependents go explicitly:
+    # SQLite doesn't enforce the cascading FKs by default, and the reports and
+    # blacklisted_tokens FKs have no ON DELETE at all
+    is_not_admin = User.role != 'ADMIN'
+    candidate_ids = select(User.id).where(User.id == candidate_id, is_not_admin)
+    assessment_ids = select(Assessment.id).where(Assessment.candidate_id.in_(candidate_ids))
+    db.execute(delete(Report).where(Report.assessment_id.in_(assessment_ids)))
+    db.execute(delete(AssessmentItem).where(AssessmentItem.assessment_id.in_(assessment_ids)))
+    db.execute(delete(Assessment).where(Assessment.candidate_id.in_(candidate_ids)))
+    db.execute(delete(CandidateProfile).where(CandidateProfile.user_id.in_(candidate_ids)))
+    db.execute(delete(BlacklistedToken).where(BlacklistedToken.user_id.in_(candidate_ids)))
+    result = db.execute(delete(User).where(User.id == candidate_id, is_not_admin))
+    
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    # Delete related assessments first
-    db.query(Assessment).filter(Assessment.candidate_id == candidate_id).delete()
-    
-    # Delete the candidate
-    db.delete(candidate)
     db.commit()
+    invalidate_overview_cache()
+    invalidate_cached_user(candidate_id)
     
     return {"message": "Candidate deleted successfully"}
 
@@ -284,44 +418,48 @@ async def get_admin_assessments(
 ):
     """Get all assessments for admin"""
     
-    query = db.query(Assessment)
+    # Candidate and job role come back in the same SELECT; only the listed
+    # columns are fetched, skipping the integrity_flags JSON
+    query = db.query(Assessment).options(
+        load_only(
+            Assessment.id, Assessment.candidate_id, Assessment.job_role_id, Assessment.status,
+            Assessment.started_at, Assessment.completed_at, Assessment.total_score
+        ),
+        joinedload(Assessment.candidate).load_only(User.full_name),
+        joinedload(Assessment.job_role).load_only(JobRole.title),
+        raiseload("*")
+    )
     
     if status:
         query = query.filter(Assessment.status == status)
     
-    assessments = query.all()
-    
-    result = []
-    for assessment in assessments:
-        # Get candidate info
-        candidate = db.query(User).filter(User.id == assessment.candidate_id).first()
-        
-        # Get job role info
-        job_role = None
-        if assessment.job_role_id:
-            job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
-        
-        # Calculate progress percentage
-        progress_percentage = 0
-        if assessment.total_score is not None:
-            progress_percentage = 100
-        elif assessment.status == 'IN_PROGRESS':
-            progress_percentage = 50
-        
-        result.append({
-            "id": assessment.id,
-            "candidate_id": assessment.candidate_id,
-            "job_role_id": assessment.job_role_id,
-            "status": assessment.status,
-            "started_at": assessment.started_at.isoformat() if assessment.started_at else None,
-            "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None,
-            "total_score": assessment.total_score,
-            "candidate_name": candidate.full_name if candidate else None,
-            "job_role_title": job_role.title if job_role else None,
-            "progress_percentage": progress_percentage
-        })
-    
-    return result
+    def rows():
+        # yield_per keeps only one batch of ORM objects alive at a time
+        for assessment in query.yield_per(STREAM_BATCH_SIZE):
+            candidate = assessment.candidate
+            job_role = assessment.job_role
+            
+            # Calculate progress percentage
+            progress_percentage = 0
+            if assessment.total_score is not None:
+                progress_percentage = 100
+            elif assessment.status == 'IN_PROGRESS':
+                progress_percentage = 50
+            
+            yield {
+                "id": assessment.id,
+                "candidate_id": assessment.candidate_id,
+                "job_role_id": assessment.job_role_id,
+                "status": assessment.status,
+                "started_at": assessment.started_at.isoformat() if assessment.started_at else None,
+                "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None,
+                "total_score": assessment.total_score,
+                "candidate_name": candidate.full_name if candidate else None,
+                "job_role_title": job_role.title if job_role else None,
+                "progress_percentage": progress_percentage
+            }
+    
+    return StreamingResponse(_stream_json_array(rows()), media_type="application/json")
 
 @router.get("/assessments/{assessment_id}")
 async def get_admin_assessment(
@@ -331,18 +469,17 @@ async def get_admin_assessment(
 ):
     """Get a specific assessment for admin"""
     
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = db.query(Assessment).options(
+        joinedload(Assessment.candidate),
+        joinedload(Assessment.job_role),
+        raiseload("*")
+    ).filter(Assessment.id == assessment_id).first()
     
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    # Get candidate info
-    candidate = db.query(User).filter(User.id == assessment.candidate_id).first()
-    
-    # Get job role info
-    job_role = None
-    if assessment.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
+    candidate = assessment.candidate
+    job_role = assessment.job_role
     
     # Calculate progress percentage
     progress_percentage = 0
@@ -372,13 +509,17 @@ async def delete_admin_assessment(
 ):
     """Delete an assessment (admin only)"""
     
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    # reports.assessment_id has no ON DELETE, so its rows go first
+    db.execute(delete(Report).where(Report.assessment_id == assessment_id))
+    db.execute(delete(AssessmentItem).where(AssessmentItem.assessment_id == assessment_id))
+    result = db.execute(delete(Assessment).where(Assessment.id == assessment_id))
     
-    if not assessment:
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    db.delete(assessment)
     db.commit()
+    invalidate_overview_cache()
     
     return {"message": "Assessment deleted successfully"}
 
@@ -390,7 +531,7 @@ async def get_admin_job_role(
 ):
     """Get a specific job role for admin"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = db.query(JobRole).options(raiseload("*")).filter(JobRole.id == job_role_id).first()
     
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
@@ -406,18 +547,20 @@ async def update_admin_job_role(
 ):
     """Update a job role (admin only)"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
-    
-    if not job_role:
-        raise HTTPException(status_code=404, detail="Job role not found")
-    
-    # Update allowed fields
-    for field, value in update_data.items():
-        if hasattr(job_role, field) and field in ['title', 'description', 'traits_json', 'config_json']:
-            setattr(job_role, field, value)
+    allowed = {k: v for k, v in update_data.items() if k in JOB_ROLE_PATCH_FIELDS}
+    if not allowed:
+        raise HTTPException(status_code=400, detail="No updatable fields provided")
     
+    result = db.execute(
+        update(JobRole)
+        .where(JobRole.id == job_role_id)
+        .values(**allowed)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
-    db.refresh(job_role)
+    
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Job role not found")
     
     return {"message": "Job role updated successfully"}
 
@@ -429,29 +572,34 @@ async def delete_admin_job_role(
 ):
     """Delete a job role (admin only)"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
-    
-    if not job_role:
-        raise HTTPException(status_code=404, detail="Job role not found")
+    # Both reference checks in one round-trip; EXISTS stops at the first match.
+    # CASE-wrapped because Oracle doesn't accept a bare EXISTS in the select list
+    has_candidates, has_assessments = db.execute(
+        select(
+            case((exists().where(CandidateProfile.job_role_id == job_role_id), 1), else_=0),
+            case((exists().where(Assessment.job_role_id == job_role_id), 1), else_=0)
+        )
+    ).one()
     
-    # Check if any candidates are assigned to this job role
-    candidates_with_role = db.query(CandidateProfile).filter(CandidateProfile.job_role_id == job_role_id).count()
-    if candidates_with_role > 0:
+    if has_candidates:
         raise HTTPException(
             status_code=400, 
-            detail=f"Cannot delete job role. {candidates_with_role} candidates are assigned to this role."
+            detail="Cannot delete job role. Candidates are assigned to this role."
         )
     
-    # Check if any assessments use this job role
-    assessments_with_role = db.query(Assessment).filter(Assessment.job_role_id == job_role_id).count()
-    if assessments_with_role > 0:
+    if has_assessments:
         raise HTTPException(
             status_code=400, 
-            detail=f"Cannot delete job role. {assessments_with_role} assessments use this role."
+            detail="Cannot delete job role. Assessments use this role."
         )
     
-    db.delete(job_role)
+    result = db.execute(delete(JobRole).where(JobRole.id == job_role_id))
+    if result.rowcount == 0:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Job role not found")
+    
     db.commit()
+    invalidate_overview_cache()
     
     return {"message": "Job role deleted successfully"}
 
@@ -463,27 +611,20 @@ async def analyze_admin_job_role(
 ):
     """Analyze a job role and update traits (admin only)"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    # Update the job role with analyzed traits; a single UPDATE, no load or refresh
+    result = db.execute(
+        update(JobRole).where(JobRole.id == job_role_id).values(traits_json=DEFAULT_JOB_ROLE_TRAITS)
+    )
     
-    if not job_role:
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Job role not found")
     
-    # Simple analysis - in a real app this would use AI/ML
-    traits = {
-        "cognitive_flexibility": {"required": True, "weight": 0.8},
-        "working_memory": {"required": True, "weight": 0.7},
-        "processing_speed": {"required": False, "weight": 0.6},
-        "attention_control": {"required": True, "weight": 0.9}
-    }
-    
-    # Update the job role with analyzed traits
-    job_role.traits_json = traits
     db.commit()
-    db.refresh(job_role)
     
     return {
         "message": "Job role analysis completed",
-        "traits": traits
+        "traits": DEFAULT_JOB_ROLE_TRAITS
     }
 
 # Job Roles endpoints for admin
@@ -495,18 +636,29 @@ async def get_admin_job_roles(
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Get all job roles for admin"""
-    job_roles = db.query(JobRole).offset(skip).limit(limit).all()
+    # Project only the response columns so no ORM entities (or their relationships) are loaded
+    rows = db.execute(
+        select(
+            JobRole.id,
+            JobRole.title,
+            JobRole.description,
+            JobRole.traits_json,
+            JobRole.config_json,
+            JobRole.created_at
+        ).offset(skip).limit(limit)
+    ).all()
 
-    return [
+    # Rows are already JSON-ready, so hand them straight to orjson and skip jsonable_encoder
+    return ORJSONResponse([
         {
-            "id": jr.id,
-            "title": jr.title,
-            "description": jr.description,
-            "traits_json": jr.traits_json,
-            "config_json": jr.config_json,
-            "created_at": jr.created_at.isoformat()
-        } for jr in job_roles
-    ]
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "traits_json": row.traits_json,
+            "config_json": row.config_json,
+            "created_at": row.created_at.isoformat() if row.created_at else None
+        } for row in rows
+    ])
 
 @router.post("/job-roles")
 async def create_admin_job_role(
@@ -516,127 +668,24 @@ async def create_admin_job_role(
 ):
     """Create a new job role"""
     
-    # Create new job role
-    new_job_role = JobRole(
-        id=str(uuid.uuid4()),
-        title=job_role_data.get("title"),
-        description=job_role_data.get("description"),
-        traits_json=job_role_data.get("traits_json"),
-        config_json=job_role_data.get("config_json")
-    )
-    
-    db.add(new_job_role)
-    db.commit()
-    db.refresh(new_job_role)
-    
-    return {
-        "id": new_job_role.id,
-        "title": new_job_role.title,
-        "description": new_job_role.description,
-        "traits_json": new_job_role.traits_json,
-        "config_json": new_job_role.config_json,
-        "created_at": new_job_role.created_at.isoformat()
+    # Create new job role; RETURNING hands back the generated columns without a refresh SELECT
+    row = {
+        "id": generate_id(),
+        "title": job_role_data.get("title"),
+        "description": job_role_data.get("description"),
+        "traits_json": job_role_data.get("traits_json"),
+        "config_json": job_role_data.get("config_json")
     }
-
-@router.get("/job-roles/{job_role_id}")
-async def get_admin_job_role(
-    job_role_id: str,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user)
-):
-    """Get a specific job role for admin"""
-    
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
-    if not job_role:
-        raise HTTPException(status_code=404, detail="Job role not found")
-    
-    return {
-        "id": job_role.id,
-        "title": job_role.title,
-        "description": job_role.description,
-        "traits_json": job_role.traits_json,
-        "config_json": job_role.config_json,
-        "created_at": job_role.created_at.isoformat()
-    }
-
-@router.patch("/job-roles/{job_role_id}")
-async def update_admin_job_role(
-    job_role_id: str,
-    job_role_data: dict,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user)
-):
-    """Update a job role"""
-    
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
-    if not job_role:
-        raise HTTPException(status_code=404, detail="Job role not found")
-    
-    # Update fields if provided
-    if "title" in job_role_data:
-        job_role.title = job_role_data["title"]
-    if "description" in job_role_data:
-        job_role.description = job_role_data["description"]
-    if "traits_json" in job_role_data:
-        job_role.traits_json = job_role_data["traits_json"]
-    if "config_json" in job_role_data:
-        job_role.config_json = job_role_data["config_json"]
     
+    result = db.execute(
+        insert(JobRole).values(**row).returning(JobRole.id, JobRole.created_at)
+    )
+    job_role_id, created_at = result.one()
     db.commit()
-    db.refresh(job_role)
+    invalidate_overview_cache()
     
     return {
-        "id": job_role.id,
-        "title": job_role.title,
-        "description": job_role.description,
-        "traits_json": job_role.traits_json,
-        "config_json": job_role.config_json,
-        "created_at": job_role.created_at.isoformat()
-    }
-
-@router.delete("/job-roles/{job_role_id}")
-async def delete_admin_job_role(
-    job_role_id: str,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user)
-):
-    """Delete a job role"""
-    
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
-    if not job_role:
-        raise HTTPException(status_code=404, detail="Job role not found")
-    
-    db.delete(job_role)
-    db.commit()
-    
-    return {"message": "Job role deleted successfully"}
-
-@router.post("/job-roles/{job_role_id}/analyze")
-async def analyze_admin_job_role(
-    job_role_id: str,
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user)
-):
-    """Analyze a job role and generate traits"""
-    
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
-    if not job_role:
-        raise HTTPException(status_code=404, detail="Job role not found")
-    
-    # Mock analysis - in real implementation, this would use AI
-    traits = {
-        "analytical_thinking": {"required": True, "weight": 0.8},
-        "working_memory": {"required": True, "weight": 0.7},
-        "processing_speed": {"required": False, "weight": 0.6},
-        "attention_control": {"required": True, "weight": 0.9}
+        **row,
+        "id": job_role_id,
+        "created_at": created_at.isoformat()
     }
-    
-    # Update the job role with analyzed traits
-    job_role.traits_json = traits
-    db.commit()
-    db.refresh(job_role)
-    
-    return {
-        "message": "Job role analysis completed",
-        "traits": traits
-    }
\ No newline at end of file
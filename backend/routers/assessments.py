@@ -1,15 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import case, exists, func, insert, or_, select, update
+from sqlalchemy.orm import Session, joinedload, raiseload
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
-import uuid
 from datetime import datetime, timedelta
 from database import get_db
-from models import Assessment, AssessmentItem, User, JobRole, Game, Tenant
-from routers.auth import get_current_admin_user, get_current_user, log_audit_action
+from pagination import NEXT_CURSOR_HEADER, keyset_page
+from models import Assessment, AssessmentItem, User, JobRole, Game, generate_id, utcnow
+from models import ACTIVE_ASSESSMENT_STATUSES, ASSESSMENT_STATUSES
+from routers.auth import get_current_admin_user, get_current_user, get_default_tenant_id, log_audit_action
+from routers.auth import Principal, get_current_principal
+from routers.admin import invalidate_overview_cache
 
 router = APIRouter()
 
+def _assessment_query(db: Session):
+    """Assessment query with the relationships the response formatter reads"""
+    # joinedload for the many-to-one hops: candidate -> profile and job role.
+    # raiseload on everything else so a new lazy load fails loudly instead of going N+1
+    return db.query(Assessment).options(
+        joinedload(Assessment.candidate).joinedload(User.candidate_profile),
+        joinedload(Assessment.job_role),
+        raiseload("*")
+    )
+
 # Pydantic models
 class AssessmentCreate(BaseModel):
     candidate_id: str
@@ -21,19 +36,23 @@ class AssessmentUpdate(BaseModel):
     total_score: Optional[float] = None
 
 class AssessmentResponse(BaseModel):
+    # Validated straight from the Assessment ORM object; candidate_name and
+    # job_role_title are model properties over the eager-loaded relationships
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     tenant_id: str
     candidate_id: str
     job_role_id: str
     status: str
-    started_at: Optional[str]
-    completed_at: Optional[str]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
     total_score: Optional[float]
     integrity_flags: Optional[dict]
-    created_at: str
+    created_at: datetime
     candidate_name: Optional[str]
     job_role_title: Optional[str]
-    progress_percentage: float
+    progress_percentage: float = 0
 
 class AssessmentItemResponse(BaseModel):
     id: str
@@ -59,7 +78,7 @@ class SubmitItemRequest(BaseModel):
     response_time_ms: Optional[int] = None
 
 @router.post("/", response_model=AssessmentResponse)
-async def create_assessment(
+def create_assessment(
     assessment_data: AssessmentCreate,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -75,30 +94,20 @@ async def create_assessment(
         raise HTTPException(status_code=404, detail="Job role not found")
 
     # Get tenant
-    tenant = db.query(Tenant).first()
-    if not tenant:
-        tenant = Tenant(
-            id=str(uuid.uuid4()),
-            name="Default Tenant",
-            subdomain="default"
-        )
-        db.add(tenant)
-        db.commit()
-        db.refresh(tenant)
+    tenant_id = get_default_tenant_id(db)
 
     # Create assessment
     db_assessment = Assessment(
-        id=str(uuid.uuid4()),
-        tenant_id=tenant.id,
+        id=generate_id(),
+        tenant_id=tenant_id,
         candidate_id=assessment_data.candidate_id,
         job_role_id=assessment_data.job_role_id,
         status="NOT_STARTED",
-        integrity_flags={}
+        integrity_flags={},
+        created_at=utcnow()
     )
 
     db.add(db_assessment)
-    db.commit()
-    db.refresh(db_assessment)
 
     # Log creation
     log_audit_action(
@@ -112,21 +121,24 @@ async def create_assessment(
             "job_role_id": assessment_data.job_role_id
         }
     )
+    db.commit()
+    invalidate_overview_cache()
 
-    return await _format_assessment_response(db_assessment, db)
+    return _format_assessment_response(db_assessment, db)
 
 @router.get("/", response_model=List[AssessmentResponse])
-async def get_assessments(
-    skip: int = 0,
-    limit: int = 100,
+def get_assessments(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = None,
     candidate_id: Optional[str] = None,
     job_role_id: Optional[str] = None,
     status: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     # Build query
-    query = db.query(Assessment)
+    query = _assessment_query(db)
 
     # Apply filters
     if candidate_id:
@@ -136,7 +148,7 @@ async def get_assessments(
         query = query.filter(Assessment.job_role_id == job_role_id)
 
     if status:
-        if status not in ["NOT_STARTED", "IN_PROGRESS", "COMPLETED", "EXPIRED", "CANCELLED"]:
+        if status not in ASSESSMENT_STATUSES:
             raise HTTPException(status_code=400, detail="Invalid status filter")
         query = query.filter(Assessment.status == status)
 
@@ -144,21 +156,48 @@ async def get_assessments(
     if current_user.role == "CANDIDATE":
         query = query.filter(Assessment.candidate_id == current_user.id)
 
-    assessments = query.offset(skip).limit(limit).all()
+    # Keyset pagination on (created_at, id); skip is only honoured without a cursor
+    assessments, next_cursor = keyset_page(
+        query, Assessment.created_at, Assessment.id, limit, cursor=cursor, skip=skip
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
 
-    result = []
-    for assessment in assessments:
-        result.append(await _format_assessment_response(assessment, db))
+    # Candidate, profile and job role come in with the page; progress is one grouped query
+    progress = _load_assessment_progress(assessments, db)
+    # The items are already validated AssessmentResponse models, so encode them with
+    # orjson directly instead of a second jsonable_encoder + json.dumps pass
+    return ORJSONResponse([
+        _format_assessment_response_prefetched(assessment, progress).model_dump()
+        for assessment in assessments
+    ], headers=headers)
 
-    return result
+@router.get("/current")
+def get_current_assessment(
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Get the current assessment for the logged-in candidate"""
+    if current_user.role != "CANDIDATE":
+        raise HTTPException(status_code=403, detail="Only candidates can access current assessment")
+
+    # Find the most recent assessment for this candidate
+    assessment = _assessment_query(db).filter(
+        Assessment.candidate_id == current_user.id,
+        Assessment.status.in_(ACTIVE_ASSESSMENT_STATUSES)
+    ).order_by(Assessment.created_at.desc()).first()
+
+    if not assessment:
+        return {"assessment": None, "message": "No active assessment found"}
+
+    return {"assessment": _format_assessment_response(assessment, db)}
 
 @router.get("/{assessment_id}", response_model=AssessmentResponse)
-async def get_assessment(
+def get_assessment(
     assessment_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = _assessment_query(db).filter(Assessment.id == assessment_id).first()
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
@@ -166,36 +205,33 @@ async def get_assessment(
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return await _format_assessment_response(assessment, db)
+    return _format_assessment_response(assessment, db)
 
 @router.put("/{assessment_id}", response_model=AssessmentResponse)
-async def update_assessment(
+def update_assessment(
     assessment_id: str,
     assessment_data: AssessmentUpdate,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = _assessment_query(db).filter(Assessment.id == assessment_id).first()
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
     # Validate status if provided
     if assessment_data.status:
-        if assessment_data.status not in ["NOT_STARTED", "IN_PROGRESS", "COMPLETED", "EXPIRED", "CANCELLED"]:
+        if assessment_data.status not in ASSESSMENT_STATUSES:
             raise HTTPException(status_code=400, detail="Invalid status")
 
     # Update fields
     if assessment_data.status:
         assessment.status = assessment_data.status
         if assessment_data.status == "COMPLETED" and not assessment.completed_at:
-            assessment.completed_at = datetime.utcnow()
+            assessment.completed_at = utcnow()
 
     if assessment_data.total_score is not None:
         assessment.total_score = assessment_data.total_score
 
-    db.commit()
-    db.refresh(assessment)
-
     # Log update
     log_audit_action(
         db,
@@ -208,11 +244,12 @@ async def update_assessment(
             "total_score": assessment_data.total_score
         }
     )
+    db.commit()
 
-    return await _format_assessment_response(assessment, db)
+    return _format_assessment_response(assessment, db)
 
 @router.delete("/{assessment_id}")
-async def delete_assessment(
+def delete_assessment(
     assessment_id: str,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -237,16 +274,20 @@ async def delete_assessment(
 
     db.delete(assessment)
     db.commit()
+    invalidate_overview_cache()
 
     return {"message": "Assessment deleted successfully"}
 
 @router.post("/{assessment_id}/start")
-async def start_assessment(
+def start_assessment(
     assessment_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    # Job role traits pick the games, so fetch the role in the same statement
+    assessment = db.query(Assessment).options(
+        joinedload(Assessment.job_role)
+    ).filter(Assessment.id == assessment_id).first()
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
@@ -260,12 +301,10 @@ async def start_assessment(
 
     # Update assessment status
     assessment.status = "IN_PROGRESS"
-    assessment.started_at = datetime.utcnow()
+    assessment.started_at = utcnow()
 
     # Create assessment items based on job role traits
-    await _create_assessment_items(assessment, db)
-
-    db.commit()
+    _create_assessment_items(assessment, db)
 
     # Log start
     log_audit_action(
@@ -276,13 +315,14 @@ async def start_assessment(
         assessment_id,
         {"candidate_id": assessment.candidate_id}
     )
+    db.commit()
 
     return {"message": "Assessment started successfully"}
 
 @router.get("/{assessment_id}/items", response_model=List[AssessmentItemResponse])
-async def get_assessment_items(
+def get_assessment_items(
     assessment_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
@@ -293,11 +333,14 @@ async def get_assessment_items(
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment_id).order_by(AssessmentItem.order_index).all()
+    items = db.query(AssessmentItem).options(
+        joinedload(AssessmentItem.game),
+        raiseload("*")
+    ).filter(AssessmentItem.assessment_id == assessment_id).order_by(AssessmentItem.order_index).all()
 
     result = []
     for item in items:
-        game = db.query(Game).filter(Game.id == item.game_id).first()
+        game = item.game
         result.append({
             "id": item.id,
             "assessment_id": item.assessment_id,
@@ -317,7 +360,7 @@ async def get_assessment_items(
     return result
 
 @router.post("/items/{item_id}/start")
-async def start_assessment_item(
+def start_assessment_item(
     item_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -337,7 +380,7 @@ async def start_assessment_item(
 
     # Update item status
     item.status = "ACTIVE"
-    item.server_started_at = datetime.utcnow()
+    item.server_started_at = utcnow()
 
     if item.timer_seconds:
         item.server_deadline_at = item.server_started_at + timedelta(seconds=item.timer_seconds)
@@ -350,7 +393,7 @@ async def start_assessment_item(
     }
 
 @router.post("/items/{item_id}/submit")
-async def submit_assessment_item(
+def submit_assessment_item(
     item_id: str,
     submission: SubmitItemRequest,
     current_user: User = Depends(get_current_user),
@@ -377,170 +420,109 @@ async def submit_assessment_item(
     db.commit()
 
     # Check if assessment is complete
-    await _check_assessment_completion(assessment, db)
+    _check_assessment_completion(assessment, db)
 
     return {"message": "Assessment item submitted successfully"}
 
-@router.get("/current")
-async def get_current_assessment(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get the current assessment for the logged-in candidate"""
-    if current_user.role != "CANDIDATE":
-        raise HTTPException(status_code=403, detail="Only candidates can access current assessment")
-
-    # Find the most recent assessment for this candidate
-    assessment = db.query(Assessment).filter(
-        Assessment.candidate_id == current_user.id,
-        Assessment.status.in_(["NOT_STARTED", "IN_PROGRESS"])
-    ).order_by(Assessment.created_at.desc()).first()
+# Games used when the job role has no traits, 5 minutes each
+DEFAULT_GAME_CODES = ("NBACK", "STROOP", "REACTION_TIME")
 
-    if not assessment:
-        return {"assessment": None, "message": "No active assessment found"}
+# (trait, game code, timer seconds, config snapshot), in assessment order
+TRAIT_GAMES = (
+    ("memory", "NBACK", 300, {"n": 2, "trials": 20, "difficulty": "medium"}),
+    ("attention", "STROOP", 240, {"trials": 30, "difficulty": "medium"}),
+    ("processing_speed", "REACTION_TIME", 180, {"trials": 25, "difficulty": "medium"}),
+)
 
-    return {"assessment": await _format_assessment_response(assessment, db)}
+def _item_row(assessment_id: str, game_id: str, order_index: int, timer_seconds: int, config_snapshot: dict) -> dict:
+    return {
+        "id": generate_id(),
+        "assessment_id": assessment_id,
+        "game_id": game_id,
+        "order_index": order_index,
+        "timer_seconds": timer_seconds,
+        "status": "PENDING",
+        "config_snapshot": config_snapshot
+    }
 
-async def _create_assessment_items(assessment: Assessment, db: Session):
+def _create_assessment_items(assessment: Assessment, db: Session):
     """Create assessment items based on job role traits"""
-    # Get job role traits
-    job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
-    if not job_role or not job_role.traits_json:
-        # Default games if no traits specified
-        default_games = ["NBACK", "STROOP", "REACTION_TIME"]
-        for i, game_code in enumerate(default_games):
-            game = db.query(Game).filter(Game.code == game_code).first()
-            if game:
-                item = AssessmentItem(
-                    id=str(uuid.uuid4()),
-                    assessment_id=assessment.id,
-                    game_id=game.id,
-                    order_index=i,
-                    timer_seconds=300,  # 5 minutes
-                    status="PENDING",
-                    config_snapshot={}
-                )
-                db.add(item)
-        return
-
-    # Create items based on traits
-    order_index = 0
-    traits = job_role.traits_json
-
-    # Memory trait -> N-Back game
-    if traits.get("memory", {}).get("required", False):
-        game = db.query(Game).filter(Game.code == "NBACK").first()
-        if game:
-            item = AssessmentItem(
-                id=str(uuid.uuid4()),
-                assessment_id=assessment.id,
-                game_id=game.id,
-                order_index=order_index,
-                timer_seconds=300,
-                status="PENDING",
-                config_snapshot={"n": 2, "trials": 20, "difficulty": "medium"}
-            )
-            db.add(item)
-            order_index += 1
-
-    # Attention trait -> Continuous Performance Task
-    if traits.get("attention", {}).get("required", False):
-        game = db.query(Game).filter(Game.code == "STROOP").first()
-        if game:
-            item = AssessmentItem(
-                id=str(uuid.uuid4()),
-                assessment_id=assessment.id,
-                game_id=game.id,
-                order_index=order_index,
-                timer_seconds=240,
-                status="PENDING",
-                config_snapshot={"trials": 30, "difficulty": "medium"}
-            )
-            db.add(item)
-            order_index += 1
-
-    # Processing speed trait -> Reaction Time game
-    if traits.get("processing_speed", {}).get("required", False):
-        game = db.query(Game).filter(Game.code == "REACTION_TIME").first()
-        if game:
-            item = AssessmentItem(
-                id=str(uuid.uuid4()),
-                assessment_id=assessment.id,
-                game_id=game.id,
-                order_index=order_index,
-                timer_seconds=180,
-                status="PENDING",
-                config_snapshot={"trials": 25, "difficulty": "medium"}
-            )
-            db.add(item)
-            order_index += 1
-
-async def _check_assessment_completion(assessment: Assessment, db: Session):
-    """Check if assessment is complete and calculate final score"""
-    items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment.id).all()
-
-    if not items:
-        return
+    # Callers load the job role together with the assessment
+    job_role = assessment.job_role
+
+    traits = job_role.traits_json if job_role else None
+    if traits:
+        # Create items based on traits
+        specs = [
+            (game_code, timer_seconds, config_snapshot)
+            for trait, game_code, timer_seconds, config_snapshot in TRAIT_GAMES
+            if traits.get(trait, {}).get("required", False)
+        ]
+    else:
+        specs = [(game_code, 300, {}) for game_code in DEFAULT_GAME_CODES]
 
-    # Check if all items are submitted
-    submitted_count = sum(1 for item in items if item.status == "SUBMITTED")
-    total_count = len(items)
+    # Every needed game id in one IN query
+    game_ids = dict(
+        db.query(Game.code, Game.id).filter(Game.code.in_([code for code, _, _ in specs]))
+    ) if specs else {}
 
-    if submitted_count == total_count:
-        # Calculate total score
-        total_score = 0
-        valid_scores = 0
+    rows = []
+    for i, (game_code, timer_seconds, config_snapshot) in enumerate(specs):
+        if game_code in game_ids:
+            # Default items keep their fixed slot; trait items are numbered densely
+            order_index = len(rows) if traits else i
+            rows.append(_item_row(assessment.id, game_ids[game_code], order_index, timer_seconds, config_snapshot))
 
-        for item in items:
-            if item.score is not None:
-                total_score += item.score
-                valid_scores += 1
+    # Ids come from generate_id(), so every item goes in one multi-row INSERT
+    if rows:
+        db.execute(insert(AssessmentItem), rows)
 
-        if valid_scores > 0:
-            assessment.total_score = total_score / valid_scores
-        else:
-            assessment.total_score = 0
+def _check_assessment_completion(assessment: Assessment, db: Session):
+    """Check if assessment is complete and calculate final score"""
+    items = AssessmentItem.assessment_id == assessment.id
+    unsubmitted = or_(AssessmentItem.status.is_(None), AssessmentItem.status != "SUBMITTED")
+
+    # One UPDATE that only matches once every item is submitted; AVG skips NULL scores
+    result = db.execute(
+        update(Assessment)
+        .where(
+            Assessment.id == assessment.id,
+            exists().where(items),
+            ~exists().where(items, unsubmitted)
+        )
+        .values(
+            total_score=func.coalesce(
+                select(func.avg(AssessmentItem.score)).where(items).scalar_subquery(), 0
+            ),
+            status="COMPLETED",
+            completed_at=utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        db.commit()
 
-        assessment.status = "COMPLETED"
-        assessment.completed_at = datetime.utcnow()
+def _load_assessment_progress(assessments: List[Assessment], db: Session) -> dict:
+    """Submitted/total item counts per assessment, one grouped query for the whole page"""
+    assessment_ids = [a.id for a in assessments]
+    if not assessment_ids:
+        return {}
+    return {
+        row.assessment_id: (row.submitted or 0, row.total)
+        for row in db.query(
+            AssessmentItem.assessment_id,
+            func.sum(case((AssessmentItem.status == "SUBMITTED", 1), else_=0)).label("submitted"),
+            func.count(AssessmentItem.id).label("total")
+        ).filter(AssessmentItem.assessment_id.in_(assessment_ids)).group_by(AssessmentItem.assessment_id)
+    }
 
-        db.commit()
+def _format_assessment_response_prefetched(assessment: Assessment, progress_by_assessment: dict) -> AssessmentResponse:
+    """Build the response from an assessment whose candidate and job role are already loaded; issues no queries"""
+    response = AssessmentResponse.model_validate(assessment)
+    submitted, total = progress_by_assessment.get(assessment.id, (0, 0))
+    response.progress_percentage = (submitted / total) * 100 if total else 0
+    return response
 
-async def _format_assessment_response(assessment: Assessment, db: Session) -> dict:
+def _format_assessment_response(assessment: Assessment, db: Session) -> AssessmentResponse:
     """Format assessment response with additional data"""
-    # Get candidate name
-    candidate = db.query(User).filter(User.id == assessment.candidate_id).first()
-    candidate_name = None
-    if candidate:
-        # Try to get from candidate profile
-        from models import CandidateProfile
-        profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == candidate.id).first()
-        candidate_name = profile.full_name if profile else candidate.username
-
-    # Get job role title
-    job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
-    job_role_title = job_role.title if job_role else None
-
-    # Calculate progress
-    items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment.id).all()
-    if items:
-        completed_items = sum(1 for item in items if item.status == "SUBMITTED")
-        progress_percentage = (completed_items / len(items)) * 100
-    else:
-        progress_percentage = 0
-
-    return {
-        "id": assessment.id,
-        "tenant_id": assessment.tenant_id,
-        "candidate_id": assessment.candidate_id,
-        "job_role_id": assessment.job_role_id,
-        "status": assessment.status,
-        "started_at": assessment.started_at.isoformat() if assessment.started_at else None,
-        "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None,
-        "total_score": assessment.total_score,
-        "integrity_flags": assessment.integrity_flags,
-        "created_at": assessment.created_at.isoformat(),
-        "candidate_name": candidate_name,
-        "job_role_title": job_role_title,
-        "progress_percentage": progress_percentage
-    }
\ No newline at end of file
+    return _format_assessment_response_prefetched(assessment, _load_assessment_progress([assessment], db))
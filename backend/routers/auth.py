@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from sqlalchemy import case, delete, exists, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, make_transient_to_detached
+from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+import asyncio
+import orjson
+import os
+import threading
+import time
 import uuid
 from database import get_db
-from models import User, Tenant, AuditLog, BlacklistedToken
-import os
+from models import USER_ROLES, User, Tenant, JobRole, AuditLog, BlacklistedToken, generate_id, utcnow
+from config import settings
 
 router = APIRouter()
 
@@ -38,25 +48,53 @@ class UserResponse(BaseModel):
     full_name: str = None
 
 # Security settings
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
+SECRET_KEY = settings().secret_key
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+ACCESS_TOKEN_EXPIRE_MINUTES = settings().access_token_expire_minutes
+
+# Cost comes from BCRYPT_ROUNDS; min == max pins it, so needs_update() flags hashes
+# made at any other cost and login re-hashes them at the configured one
+BCRYPT_ROUNDS = settings().bcrypt_rounds
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Validated tokens -> detached User snapshots, so bursts of requests with the same
+# token skip the JWT decode, the blacklist lookup and the user SELECT
+TOKEN_CACHE_TTL_SECONDS = settings().token_cache_ttl_seconds
+_token_cache = TTLCache(maxsize=1024, ttl=TOKEN_CACHE_TTL_SECONDS)
+_token_cache_lock = threading.Lock()
+
+# bcrypt costs hundreds of ms of CPU. Sync handlers already run on FastAPI's threadpool;
+# async handlers hash through get_password_hash_async so the event loop keeps serving
 def verify_password(plain_password, hashed_password):
+    # passlib compares digests in constant time; any other secret we compare
+    # directly (API keys, signatures) should go through hmac.compare_digest
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# Hashing gets its own pool sized to the cores: a batch of bcrypt calls can't take every
+# thread the sync endpoints share, and more threads than cores would only queue on the CPU
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+async def get_password_hash_async(password):
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, pwd_context.hash, password)
+
+# Verified against when the username is unknown, so a miss costs the same bcrypt
+# work as a wrong password and response timing doesn't reveal which usernames exist.
+# Hashing it at import also loads passlib's bcrypt backend before the first login
+DUMMY_PASSWORD_HASH = pwd_context.hash("dummy-password")
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
+    expire = utcnow() + (expires_delta or timedelta(minutes=15))
     
     # Add JWT ID for token tracking
     jti = str(uuid.uuid4())
@@ -64,39 +102,141 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt, jti, expire
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def _snapshot_user(user: User) -> User:
+    """Copy the column state of a user into a detached instance safe to share across sessions"""
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+# Read-mostly responses: /auth/profile keyed per user id (never shared between
+# users) and the admin /auth/users listing keyed by its query parameters
+RESPONSE_CACHE_TTL_SECONDS = 30
+_profile_cache = TTLCache(maxsize=1024, ttl=RESPONSE_CACHE_TTL_SECONDS)
+_user_list_cache = TTLCache(maxsize=64, ttl=RESPONSE_CACHE_TTL_SECONDS)
+_response_cache_lock = threading.Lock()
+
+def invalidate_user_list_cache():
+    """Drop cached /auth/users pages; call after creating or deleting users"""
+    with _response_cache_lock:
+        _user_list_cache.clear()
+
+def invalidate_cached_user(user_id: str):
+    """Drop every cached token resolution and response for a user (profile, status, password or role changes)"""
+    with _token_cache_lock:
+        for token, cached_user in list(_token_cache.items()):
+            if cached_user.id == user_id:
+                del _token_cache[token]
+    with _response_cache_lock:
+        _profile_cache.pop(user_id, None)
+        _user_list_cache.clear()
+
+def invalidate_cached_token(token: str):
+    with _token_cache_lock:
+        _token_cache.pop(token, None)
+
+# Verified claims per token, so repeat requests skip the signature check and claim
+# parsing; exp is still compared on every hit, so expiry stays exact
+_claims_cache = TTLCache(maxsize=1024, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+def decode_token(token: str = Depends(oauth2_scheme)) -> dict:
+    """Verified JWT claims; usable as a dependency so a request decodes its token once"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    with _token_cache_lock:
+        payload = _claims_cache.get(token)
+    if payload is not None:
+        if payload.get("exp", 0) <= time.time():
+            raise credentials_exception
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        jti: str = payload.get("jti")
-        
-        if username is None or jti is None:
-            raise credentials_exception
-            
-        # Check if token is blacklisted
-        blacklisted = db.query(BlacklistedToken).filter(BlacklistedToken.token_jti == jti).first()
-        if blacklisted:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been invalidated",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-            
     except JWTError:
         raise credentials_exception
+    with _token_cache_lock:
+        _claims_cache[token] = payload
+    return payload
+
+# Plain def (like the DB-bound handlers in this module): FastAPI runs it on the
+# threadpool, so the blocking Session calls never stall the event loop
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    with _token_cache_lock:
+        cached_user = _token_cache.get(token)
+    if cached_user is not None:
+        # A cached dict lookup that still rejects tokens past their exp
+        decode_token(token)
+        # Attach a copy to this request's session without re-selecting the row
+        return db.merge(cached_user, load=False)
+
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = decode_token(token)
+    username: str = payload.get("sub")
+    jti: str = payload.get("jti")
+    if username is None or jti is None:
+        raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    token_invalidated = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been invalidated",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    # Logouts from this process are known without asking the database
+    with _token_cache_lock:
+        revoked = jti in _revoked_jtis
+    if revoked:
+        raise token_invalidated
+
+    # User row and blacklist check in one round trip; CASE keeps the EXISTS portable to Oracle
+    row = db.query(
+        User,
+        case((exists().where(BlacklistedToken.token_jti == jti), 1), else_=0)
+    ).filter(User.username == username).first()
+    if row is None:
         raise credentials_exception
+    user, blacklisted = row
+    if blacklisted:
+        raise token_invalidated
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+
+    with _token_cache_lock:
+        _token_cache[token] = _snapshot_user(user)
     return user
 
+class Principal(NamedTuple):
+    """Caller identity (id, username, role) without a session-bound User"""
+    id: str
+    username: str
+    role: str
+
+# JTIs revoked by logout in this process, kept until the longest-lived token expires
+_revoked_jtis = TTLCache(maxsize=10000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    """Lightweight identity for endpoints that only need id/role
+
+    Served from the validated-token cache; a miss takes the full get_current_user
+    lookup, so a logout on another worker, a deleted or deactivated user, or a role
+    change is seen within TOKEN_CACHE_TTL_SECONDS.
+    """
+    with _token_cache_lock:
+        cached_user = _token_cache.get(token)
+    if cached_user is not None:
+        # A cached dict lookup that still rejects tokens past their exp
+        decode_token(token)
+        return Principal(cached_user.id, cached_user.username, cached_user.role)
+
+    # The blacklist table is the cross-worker source of truth, so token claims alone aren't enough
+    user = get_current_user(token, db)
+    return Principal(user.id, user.username, user.role)
+
 async def get_current_admin_user(current_user: User = Depends(get_current_user)):
     if current_user.role != "ADMIN":
         raise HTTPException(
@@ -105,7 +245,57 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
         )
     return current_user
 
+def get_current_admin_principal(current_user: Principal = Depends(get_current_principal)) -> Principal:
+    """Admin check on the validated user's current role; for read-only admin endpoints"""
+    if current_user.role != "ADMIN":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
+
+# The default tenant's id never changes once created, so one lookup serves every create call
+TENANT_CACHE_TTL_SECONDS = 3600
+_tenant_cache = TTLCache(maxsize=1, ttl=TENANT_CACHE_TTL_SECONDS)
+_tenant_cache_lock = threading.Lock()
+
+def get_default_tenant_id(db: Session) -> str:
+    """Id of the tenant new rows belong to, creating the default tenant on first use"""
+    with _tenant_cache_lock:
+        tenant_id = _tenant_cache.get("default")
+    if tenant_id is not None:
+        return tenant_id
+
+    tenant_id = db.query(Tenant.id).limit(1).scalar()
+    if tenant_id is None:
+        tenant = Tenant(
+            id=generate_id(),
+            name="Default Tenant",
+            subdomain="default"
+        )
+        db.add(tenant)
+        db.commit()
+        tenant_id = tenant.id
+
+    with _tenant_cache_lock:
+        _tenant_cache["default"] = tenant_id
+    return tenant_id
+
+def conflicting_user_field(db: Session, username: str, email: str) -> Optional[str]:
+    """After an IntegrityError inserting a user, "username" or "email" if that one is taken
+
+    None means the error wasn't a duplicate (a foreign key or CHECK constraint), and
+    the caller should re-raise it rather than report a conflict.
+    """
+    # Only the failure path pays for this lookup
+    if db.query(User.id).filter(User.username == username).first():
+        return "username"
+    if email and db.query(User.id).filter(User.email == email).first():
+        return "email"
+    return None
+
 def log_audit_action(db: Session, actor_user_id: str, action: str, target_type: str, target_id: str, payload: dict = None):
+    """Stage an audit row in the caller's transaction; the caller's commit persists it"""
     audit_log = AuditLog(
         actor_user_id=actor_user_id,
         action=action,
@@ -114,12 +304,12 @@ def log_audit_action(db: Session, actor_user_id: str, action: str, target_type:
         payload_json=payload
     )
     db.add(audit_log)
-    db.commit()
 
 @router.post("/login")
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.username == login_data.username).first()
-    if not user or not verify_password(login_data.password, user.password_hash):
+    password_ok = verify_password(login_data.password, user.password_hash if user else DUMMY_PASSWORD_HASH)
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -130,15 +320,20 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Account is deactivated")
 
     # Update last login
-    user.last_login_at = datetime.utcnow()
-    db.commit()
+    user.last_login_at = utcnow()
+    # Bring hashes from an older cost setting in line while the plaintext is at hand
+    if pwd_context.needs_update(user.password_hash):
+        user.password_hash = get_password_hash(login_data.password)
 
     # Log login action
     log_audit_action(db, user.id, "LOGIN", "USER", user.id, {"ip": "system"})
+    db.commit()
+    with _response_cache_lock:
+        _profile_cache.pop(user.id, None)
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token, jti, expires_at = create_access_token(
-        data={"sub": user.username, "role": user.role}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id, "role": user.role}, expires_delta=access_token_expires
     )
 
     return {
@@ -154,32 +349,23 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/register")
-async def register(register_data: RegisterRequest, db: Session = Depends(get_db)):
-    # Check if user exists
-    if db.query(User).filter(User.username == register_data.username).first():
-        raise HTTPException(status_code=400, detail="Username already registered")
+def register(register_data: RegisterRequest, db: Session = Depends(get_db)):
+    # Validate role; stored uppercase
+    if register_data.role.upper() not in USER_ROLES:
+        raise HTTPException(status_code=400, detail="Invalid role. Must be ADMIN or CANDIDATE")
 
-    if db.query(User).filter(User.email == register_data.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
+    # Validate job role if provided, rather than leave a bad id to the FK constraint
+    if register_data.job_role_id and not db.query(JobRole.id).filter(JobRole.id == register_data.job_role_id).first():
+        raise HTTPException(status_code=400, detail="Job role not found")
 
     # Get default tenant
-    tenant = db.query(Tenant).first()
-    if not tenant:
-        # Create default tenant if it doesn't exist
-        tenant = Tenant(
-            id=str(uuid.uuid4()),
-            name="Default Tenant",
-            subdomain="default"
-        )
-        db.add(tenant)
-        db.commit()
-        db.refresh(tenant)
+    tenant_id = get_default_tenant_id(db)
 
     # Create user
     hashed_password = get_password_hash(register_data.password)
     db_user = User(
-        id=str(uuid.uuid4()),
-        tenant_id=tenant.id,
+        id=generate_id(),
+        tenant_id=tenant_id,
         username=register_data.username,
         email=register_data.email,
         full_name=register_data.full_name,
@@ -190,7 +376,7 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
     db.add(db_user)
 
     # Create candidate profile if role is CANDIDATE
-    if register_data.role == "CANDIDATE":
+    if db_user.role == "CANDIDATE":
         from models import CandidateProfile
         candidate_profile = CandidateProfile(
             user_id=db_user.id,
@@ -198,16 +384,25 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
         )
         db.add(candidate_profile)
 
-    db.commit()
-    db.refresh(db_user)
-
     # Log registration action
     log_audit_action(db, db_user.id, "REGISTER", "USER", db_user.id, {"role": register_data.role})
+    # The unique constraints on username/email do the duplicate check in the INSERT itself
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        conflict = conflicting_user_field(db, register_data.username, register_data.email)
+        if conflict == "username":
+            raise HTTPException(status_code=400, detail="Username already registered")
+        if conflict == "email":
+            raise HTTPException(status_code=400, detail="Email already registered")
+        raise
+    invalidate_user_list_cache()
 
     # Create access token for automatic login
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token, jti, expire_time = create_access_token(
-        data={"sub": db_user.username, "role": db_user.role}, 
+        data={"sub": db_user.username, "uid": db_user.id, "role": db_user.role}, 
         expires_delta=access_token_expires
     )
 
@@ -227,9 +422,15 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
     }
 
 @router.get("/profile")
-async def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     from models import CandidateProfile
 
+    # Cached as encoded JSON, so a hit skips jsonable_encoder and json.dumps entirely
+    with _response_cache_lock:
+        cached_profile = _profile_cache.get(current_user.id)
+    if cached_profile is not None:
+        return Response(content=cached_profile, media_type="application/json")
+
     profile_data = {
         "id": current_user.id,
         "username": current_user.username,
@@ -247,10 +448,13 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
             profile_data["full_name"] = candidate_profile.full_name
             profile_data["job_role_id"] = candidate_profile.job_role_id
 
-    return profile_data
+    body = orjson.dumps(profile_data)
+    with _response_cache_lock:
+        _profile_cache[current_user.id] = body
+    return Response(content=body, media_type="application/json")
 
 @router.put("/profile")
-async def update_profile(
+def update_profile(
     profile_data: dict,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -274,15 +478,15 @@ async def update_profile(
             )
             db.add(candidate_profile)
 
-    db.commit()
-
     # Log profile update
     log_audit_action(db, current_user.id, "UPDATE_PROFILE", "USER", current_user.id, profile_data)
+    db.commit()
+    invalidate_cached_user(current_user.id)
 
     return {"message": "Profile updated successfully"}
 
 @router.post("/change-password")
-async def change_password(
+def change_password(
     password_data: dict,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -294,42 +498,63 @@ async def change_password(
         raise HTTPException(status_code=400, detail="Incorrect old password")
 
     current_user.password_hash = get_password_hash(new_password)
-    db.commit()
 
     # Log password change
     log_audit_action(db, current_user.id, "CHANGE_PASSWORD", "USER", current_user.id)
+    db.commit()
+    invalidate_cached_user(current_user.id)
 
     return {"message": "Password changed successfully"}
 
 @router.get("/users")
-async def get_users(
+def get_users(
     skip: int = 0,
     limit: int = 100,
     role: str = None,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_principal),
     db: Session = Depends(get_db)
 ):
-    query = db.query(User)
-    if role:
-        query = query.filter(User.role == role)
-
-    users = query.offset(skip).limit(limit).all()
-    return {
+    cache_key = (skip, limit, role.upper() if role else None)
+    with _response_cache_lock:
+        cached_page = _user_list_cache.get(cache_key)
+    if cached_page is not None:
+        return cached_page
+
+    # COUNT(*) OVER () returns the filtered total on every row, so the page and
+    # the total come back in one statement instead of a second COUNT query
+    filters = [User.role == role.upper()] if role else []
+    rows = db.query(
+        User.id, User.username, User.email, User.role, User.is_active, User.created_at,
+        func.count().over().label("total")
+    ).filter(*filters).offset(skip).limit(limit).all()
+
+    if rows:
+        total = rows[0].total
+    elif skip:
+        # Past the last page there is no row to carry the total
+        total = db.query(func.count(User.id)).filter(*filters).scalar()
+    else:
+        total = 0
+    page = {
         "users": [
             {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "role": user.role,
-                "is_active": user.is_active,
-                "created_at": user.created_at
-            } for user in users
+                "id": row.id,
+                "username": row.username,
+                "email": row.email,
+                "role": row.role,
+                "is_active": row.is_active,
+                "created_at": row.created_at
+            } for row in rows
         ],
-        "total": query.count()
+        "total": total
     }
 
+    with _response_cache_lock:
+        _user_list_cache[cache_key] = page
+    return page
+
 @router.put("/users/{user_id}/status")
-async def update_user_status(
+def update_user_status(
     user_id: str,
     status_data: dict,
     current_user: User = Depends(get_current_admin_user),
@@ -340,7 +565,6 @@ async def update_user_status(
         raise HTTPException(status_code=404, detail="User not found")
 
     user.is_active = status_data.get("is_active", user.is_active)
-    db.commit()
 
     # Log status change
     log_audit_action(
@@ -351,56 +575,56 @@ async def update_user_status(
         user_id,
         {"is_active": user.is_active}
     )
+    db.commit()
+    invalidate_cached_user(user_id)
 
     return {"message": "User status updated successfully"}
 
 @router.post("/logout")
-async def logout(
+def logout(
     token: str = Depends(oauth2_scheme),
-    current_user: User = Depends(get_current_user), 
+    payload: dict = Depends(decode_token),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    # Claims come from the shared decode_token dependency instead of a second decode here
+    invalidate_cached_token(token)
+    jti = payload.get("jti")
+    exp = payload.get("exp")
     try:
-        # Decode token to get JTI
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        jti = payload.get("jti")
-        exp = payload.get("exp")
-        
         if jti and exp:
-            # Convert exp timestamp to datetime
-            expires_at = datetime.utcfromtimestamp(exp)
-            
             # Add token to blacklist
             blacklisted_token = BlacklistedToken(
                 token_jti=jti,
                 user_id=current_user.id,
-                expires_at=expires_at
+                expires_at=datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
             )
             db.add(blacklisted_token)
-            db.commit()
+            with _token_cache_lock:
+                _revoked_jtis[jti] = True
             
-        # Log logout action
+        # Log logout action in the same transaction as the blacklist entry
         log_audit_action(db, current_user.id, "LOGOUT", "USER", current_user.id)
+        db.commit()
         
         return {"message": "Logged out successfully"}
     except Exception as e:
         # Log logout anyway even if blacklisting fails
+        db.rollback()
         log_audit_action(db, current_user.id, "LOGOUT", "USER", current_user.id)
+        db.commit()
         return {"message": "Logged out successfully"}
 
 @router.post("/cleanup-expired-tokens")
-async def cleanup_expired_tokens(
+def cleanup_expired_tokens(
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     """Clean up expired blacklisted tokens (admin only)"""
-    now = datetime.utcnow()
-    expired_tokens = db.query(BlacklistedToken).filter(BlacklistedToken.expires_at < now).all()
-    
-    count = len(expired_tokens)
-    for token in expired_tokens:
-        db.delete(token)
-    
+    # One DELETE over the expires_at index; nothing is loaded just to be discarded
+    count = db.execute(
+        delete(BlacklistedToken).where(BlacklistedToken.expires_at < utcnow())
+    ).rowcount
     db.commit()
     
     return {"message": f"Cleaned up {count} expired tokens"}
\ No newline at end of file
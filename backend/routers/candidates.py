@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-import uuid
 from database import get_db
-from models import User, Tenant, CandidateProfile, JobRole
-from routers.auth import get_current_admin_user, get_password_hash, log_audit_action
+from models import User, CandidateProfile, JobRole, generate_id
+from routers.auth import get_current_admin_user, get_default_tenant_id, get_password_hash_async, log_audit_action
+from routers.auth import invalidate_user_list_cache
+from routers.admin import invalidate_overview_cache
 import secrets
 import string
 import re
@@ -33,6 +35,21 @@ def generate_username_from_name(full_name: str) -> str:
         # Fallback
         return clean_name.lower().replace(' ', '')
 
+USERNAME_RETRIES = 3
+
+def allocate_username(db: Session, base_username: str) -> str:
+    """Lowest free `base_username`, `base_username1`, ... from a single prefix query"""
+    # Base usernames are letters only, so the prefix needs no LIKE escaping
+    taken = {
+        name for (name,) in db.query(User.username).filter(User.username.like(f"{base_username}%"))
+    }
+    username = base_username
+    counter = 1
+    while username in taken:
+        username = f"{base_username}{counter}"
+        counter += 1
+    return username
+
 def generate_password(length: int = 8) -> str:
     """Generate a secure random password"""
     # Mix of uppercase, lowercase, digits and special characters
@@ -64,71 +81,73 @@ async def create_candidate(
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    # Check if email already exists
-    if db.query(User).filter(User.email == candidate_data.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    # Validate job role if provided
-    job_role = None
+    # Validate job role if provided; only its title is needed for the response
+    job_role_title = None
     if candidate_data.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == candidate_data.job_role_id).first()
-        if not job_role:
+        job_role_title = db.query(JobRole.title).filter(JobRole.id == candidate_data.job_role_id).scalar()
+        if job_role_title is None:
             raise HTTPException(status_code=400, detail="Job role not found")
     
-    # Generate username from full name
-    base_username = generate_username_from_name(candidate_data.full_name)
-    username = base_username
-    
-    # Check if username already exists and add suffix if needed
-    counter = 1
-    while db.query(User).filter(User.username == username).first():
-        username = f"{base_username}{counter}"
-        counter += 1
-    
     # Generate secure password
     password = generate_password(8)
+    password_hash = await get_password_hash_async(password)
     
     # Get tenant
-    tenant = db.query(Tenant).first()
-    if not tenant:
-        raise HTTPException(status_code=500, detail="No tenant found")
-    
-    # Create user
-    user = User(
-        id=str(uuid.uuid4()),
-        tenant_id=tenant.id,
-        username=username,
-        email=candidate_data.email,
-        password_hash=get_password_hash(password),
-        role="CANDIDATE",
-        is_active=True
-    )
-    db.add(user)
-    
-    # Create candidate profile
-    profile = CandidateProfile(
-        user_id=user.id,
-        full_name=candidate_data.full_name,
-        job_role_id=candidate_data.job_role_id
-    )
-    db.add(profile)
-    
-    db.commit()
-    
-    # Log audit action
-    log_audit_action(
-        db, 
-        current_user.id, 
-        "CREATE_CANDIDATE", 
-        "USER", 
-        user.id, 
-        {
-            "email": candidate_data.email, 
-            "full_name": candidate_data.full_name,
-            "job_role_id": candidate_data.job_role_id,
-            "username": username
-        }
-    )
+    tenant_id = get_default_tenant_id(db)
+    # Names with no ASCII letters leave nothing to build on; an empty prefix would
+    # also make the LIKE match every username
+    base_username = generate_username_from_name(candidate_data.full_name) or "candidate"
+    
+    # The unique constraints settle duplicates in the INSERT itself: a taken email is
+    # a 400, a username lost to a concurrent create retries with the next free suffix
+    for attempt in range(USERNAME_RETRIES):
+        username = allocate_username(db, base_username)
+        
+        # Create user
+        user = User(
+            id=generate_id(),
+            tenant_id=tenant_id,
+            username=username,
+            email=candidate_data.email,
+            password_hash=password_hash,
+            role="CANDIDATE",
+            is_active=True
+        )
+        db.add(user)
+        
+        # Create candidate profile
+        profile = CandidateProfile(
+            user_id=user.id,
+            full_name=candidate_data.full_name,
+            job_role_id=candidate_data.job_role_id
+        )
+        db.add(profile)
+        
+        # Log audit action
+        log_audit_action(
+            db, 
+            current_user.id, 
+            "CREATE_CANDIDATE", 
+            "USER", 
+            user.id, 
+            {
+                "email": candidate_data.email, 
+                "full_name": candidate_data.full_name,
+                "job_role_id": candidate_data.job_role_id,
+                "username": username
+            }
+        )
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if db.query(User.id).filter(User.email == candidate_data.email).first():
+                raise HTTPException(status_code=400, detail="Email already registered")
+    else:
+        raise HTTPException(status_code=409, detail="Could not allocate a unique username")
+    invalidate_overview_cache()
+    invalidate_user_list_cache()
     
     return {
         "message": "Candidate created successfully",
@@ -138,38 +157,47 @@ async def create_candidate(
             "email": candidate_data.email,
             "full_name": candidate_data.full_name,
             "job_role_id": candidate_data.job_role_id,
-            "job_role_title": job_role.title if job_role else None,
+            "job_role_title": job_role_title,
             "password": password,  # Return password for admin to share with candidate
             "login_instructions": f"Username: {username}, Password: {password}"
         }
     }
 
 @router.get("/")
-async def get_candidates(
+def get_candidates(
     skip: int = 0,
     limit: int = 100,
     is_active: bool = None,
+    job_role_id: str = None,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    query = db.query(User).filter(User.role == "CANDIDATE")
+    # Profile name comes back on the same row instead of one lookup per candidate,
+    # and only the response columns are selected
+    query = (
+        db.query(
+            User.id, User.username, User.email, User.is_active, User.created_at, User.last_login_at,
+            CandidateProfile.full_name
+        )
+        .outerjoin(CandidateProfile, CandidateProfile.user_id == User.id)
+        .filter(User.role == "CANDIDATE")
+    )
     
     if is_active is not None:
         query = query.filter(User.is_active == is_active)
     
-    candidates = query.offset(skip).limit(limit).all()
+    # Filter in SQL, before offset/limit, so every page holds up to `limit` matches
+    if job_role_id:
+        query = query.filter(CandidateProfile.job_role_id == job_role_id)
     
-    result = []
-    for candidate in candidates:
-        profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == candidate.id).first()
-        result.append({
+    return [
+        {
             "id": candidate.id,
             "username": candidate.username,
             "email": candidate.email,
-            "full_name": profile.full_name if profile else None,
+            "full_name": candidate.full_name,
             "is_active": candidate.is_active,
             "created_at": candidate.created_at,
             "last_login_at": candidate.last_login_at
-        })
-    
-    return result
\ No newline at end of file
+        } for candidate in query.offset(skip).limit(limit).all()
+    ]
@@ -1,15 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import case, exists, func, select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-import uuid
+from cachetools import TTLCache
 import json
+import threading
 from database import get_db
-from models import Game, AssessmentItem, User
+from models import Game, Assessment, AssessmentItem, User, generate_id
 from routers.auth import get_current_admin_user, get_current_user, log_audit_action
 
 router = APIRouter()
 
+# The games catalogue is near-static; cache read responses until a game changes.
+# Writes only clear the handling worker's cache, so other workers may serve the
+# old catalogue for up to the TTL
+GAMES_CACHE_TTL_SECONDS = 30
+_games_cache = TTLCache(maxsize=256, ttl=GAMES_CACHE_TTL_SECONDS)
+_games_cache_lock = threading.Lock()
+
+def invalidate_games_cache():
+    """Drop cached game listings and lookups after a game is created, updated or deleted"""
+    with _games_cache_lock:
+        _games_cache.clear()
+
 # Pydantic models
 class GameCreate(BaseModel):
     code: str
@@ -42,6 +56,17 @@ class GameScoreResponse(BaseModel):
     feedback: str
     performance_level: str
 
+# Minimum normalized score for each performance level, highest first
+PERFORMANCE_LEVELS = ((85, "Excellent"), (70, "Good"), (50, "Average"))
+
+MAX_SCORE_BATCH = 100
+
+def performance_level(normalized_score: float) -> str:
+    for threshold, level in PERFORMANCE_LEVELS:
+        if normalized_score >= threshold:
+            return level
+    return "Needs Improvement"
+
 # Game scoring algorithms
 def score_nback_game(metrics: Dict[str, Any]) -> GameScoreResponse:
     """Score N-Back game performance"""
@@ -61,15 +86,7 @@ def score_nback_game(metrics: Dict[str, Any]) -> GameScoreResponse:
     # Normalize to 0-100 scale
     normalized_score = min(100, max(0, memory_score * 100))
 
-    # Determine performance level
-    if normalized_score >= 85:
-        level = "Excellent"
-    elif normalized_score >= 70:
-        level = "Good"
-    elif normalized_score >= 50:
-        level = "Average"
-    else:
-        level = "Needs Improvement"
+    level = performance_level(normalized_score)
 
     return GameScoreResponse(
         score=memory_score,
@@ -98,15 +115,7 @@ def score_stroop_game(metrics: Dict[str, Any]) -> GameScoreResponse:
     # Normalize to 0-100 scale
     normalized_score = min(100, max(0, attention_score * 100))
 
-    # Determine performance level
-    if normalized_score >= 85:
-        level = "Excellent"
-    elif normalized_score >= 70:
-        level = "Good"
-    elif normalized_score >= 50:
-        level = "Average"
-    else:
-        level = "Needs Improvement"
+    level = performance_level(normalized_score)
 
     return GameScoreResponse(
         score=attention_score,
@@ -135,15 +144,7 @@ def score_reaction_time_game(metrics: Dict[str, Any]) -> GameScoreResponse:
     # Normalize to 0-100 scale
     normalized_score = min(100, max(0, processing_score * 100))
 
-    # Determine performance level
-    if normalized_score >= 85:
-        level = "Excellent"
-    elif normalized_score >= 70:
-        level = "Good"
-    elif normalized_score >= 50:
-        level = "Average"
-    else:
-        level = "Needs Improvement"
+    level = performance_level(normalized_score)
 
     return GameScoreResponse(
         score=processing_score,
@@ -160,19 +161,18 @@ GAME_SCORING_FUNCTIONS = {
 }
 
 @router.post("/", response_model=GameResponse)
-async def create_game(
+def create_game(
     game_data: GameCreate,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    # Check if code already exists
-    existing_game = db.query(Game).filter(Game.code == game_data.code).first()
-    if existing_game:
+    # Check if code already exists; only the id is fetched, not base_config
+    if db.query(Game.id).filter(Game.code == game_data.code).first():
         raise HTTPException(status_code=400, detail="Game code already exists")
 
     # Create game
     db_game = Game(
-        id=str(uuid.uuid4()),
+        id=generate_id(),
         code=game_data.code,
         title=game_data.title,
         description=game_data.description,
@@ -180,8 +180,6 @@ async def create_game(
     )
 
     db.add(db_game)
-    db.commit()
-    db.refresh(db_game)
 
     # Log creation
     log_audit_action(
@@ -192,6 +190,8 @@ async def create_game(
         db_game.id,
         {"code": game_data.code, "title": game_data.title}
     )
+    db.commit()
+    invalidate_games_cache()
 
     return {
         "id": db_game.id,
@@ -202,13 +202,19 @@ async def create_game(
     }
 
 @router.get("/", response_model=List[GameResponse])
-async def get_games(
+def get_games(
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
+    cache_key = ("list", skip, limit, search)
+    with _games_cache_lock:
+        cached = _games_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     # Build query
     query = db.query(Game)
 
@@ -222,7 +228,7 @@ async def get_games(
 
     games = query.offset(skip).limit(limit).all()
 
-    return [
+    result = [
         {
             "id": game.id,
             "code": game.code,
@@ -231,9 +237,70 @@ async def get_games(
             "base_config": game.base_config
         } for game in games
     ]
+    with _games_cache_lock:
+        _games_cache[cache_key] = result
+    return result
+
+# Registered before /{game_id} so these paths aren't captured as a game id
+@router.get("/available")
+def get_available_games(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get all available games with their configurations"""
+    with _games_cache_lock:
+        cached = _games_cache.get("available")
+    if cached is not None:
+        return cached
+
+    games = db.query(Game).all()
+
+    result = {
+        "games": [
+            {
+                "id": game.id,
+                "code": game.code,
+                "title": game.title,
+                "description": game.description,
+                "base_config": game.base_config
+            } for game in games
+        ],
+        "total": len(games)
+    }
+    with _games_cache_lock:
+        _games_cache["available"] = result
+    return result
+
+@router.get("/by-code/{game_code}")
+def get_game_by_code(
+    game_code: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get game by code (useful for frontend)"""
+    cache_key = ("code", game_code)
+    with _games_cache_lock:
+        cached = _games_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    game = db.query(Game).filter(Game.code == game_code).first()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    result = {
+        "id": game.id,
+        "code": game.code,
+        "title": game.title,
+        "description": game.description,
+        "base_config": game.base_config
+    }
+    with _games_cache_lock:
+        _games_cache[cache_key] = result
+    return result
 
 @router.get("/{game_id}", response_model=GameResponse)
-async def get_game(
+def get_game(
     game_id: str,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -251,7 +318,7 @@ async def get_game(
     }
 
 @router.put("/{game_id}", response_model=GameResponse)
-async def update_game(
+def update_game(
     game_id: str,
     game_data: GameUpdate,
     current_user: User = Depends(get_current_admin_user),
@@ -263,8 +330,7 @@ async def update_game(
 
     # Check code uniqueness if changing
     if game_data.code and game_data.code != game.code:
-        existing = db.query(Game).filter(Game.code == game_data.code, Game.id != game_id).first()
-        if existing:
+        if db.query(Game.id).filter(Game.code == game_data.code, Game.id != game_id).first():
             raise HTTPException(status_code=400, detail="Game code already exists")
 
     # Update fields
@@ -277,9 +343,6 @@ async def update_game(
     if game_data.base_config:
         game.base_config = game_data.base_config
 
-    db.commit()
-    db.refresh(game)
-
     # Log update
     log_audit_action(
         db,
@@ -289,6 +352,8 @@ async def update_game(
         game_id,
         {"code": game.code, "title": game.title}
     )
+    db.commit()
+    invalidate_games_cache()
 
     return {
         "id": game.id,
@@ -299,7 +364,7 @@ async def update_game(
     }
 
 @router.delete("/{game_id}")
-async def delete_game(
+def delete_game(
     game_id: str,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -308,9 +373,13 @@ async def delete_game(
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    # Check if game is being used in assessments
-    assessment_count = db.query(AssessmentItem).filter(AssessmentItem.game_id == game_id).count()
-    if assessment_count > 0:
+    # Check if game is being used in assessments; EXISTS stops at the first item,
+    # the full count is only taken for the error message
+    in_use = db.execute(
+        select(case((exists().where(AssessmentItem.game_id == game_id), 1), else_=0))
+    ).scalar()
+    if in_use:
+        assessment_count = db.query(func.count(AssessmentItem.id)).filter(AssessmentItem.game_id == game_id).scalar()
         raise HTTPException(
             status_code=400,
             detail=f"Cannot delete game: {assessment_count} assessment items are using it"
@@ -328,11 +397,25 @@ async def delete_game(
 
     db.delete(game)
     db.commit()
+    invalidate_games_cache()
 
     return {"message": "Game deleted successfully"}
 
-@router.post("/score")
-async def score_game_performance(
+def _record_score(item: AssessmentItem, raw_metrics: Dict[str, Any], score_response: GameScoreResponse):
+    """Store a server-side score and its breakdown on the assessment item"""
+    item.score = score_response.score
+    item.metrics_json = {
+        **raw_metrics,
+        "server_scoring": {
+            "normalized_score": score_response.normalized_score,
+            "trait_scores": score_response.trait_scores,
+            "performance_level": score_response.performance_level,
+            "feedback": score_response.feedback
+        }
+    }
+
+@router.post("/score", response_model=GameScoreResponse)
+def score_game_performance(
     score_request: GameScoreRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -349,7 +432,6 @@ async def score_game_performance(
         raise HTTPException(status_code=404, detail="Game not found")
 
     # Check permissions via assessment
-    from models import Assessment
     assessment = db.query(Assessment).filter(Assessment.id == item.assessment_id).first()
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
@@ -361,59 +443,57 @@ async def score_game_performance(
 
     # Calculate score
     score_response = scoring_function(score_request.raw_metrics)
-
-    # Update assessment item
-    item.score = score_response.score
-    item.metrics_json = {
-        **score_request.raw_metrics,
-        "server_scoring": {
-            "normalized_score": score_response.normalized_score,
-            "trait_scores": score_response.trait_scores,
-            "performance_level": score_response.performance_level,
-            "feedback": score_response.feedback
-        }
-    }
+    _record_score(item, score_request.raw_metrics, score_response)
 
     db.commit()
 
-    return score_response.dict()
+    # Serialized once, by the response model
+    return score_response
 
-@router.get("/available")
-async def get_available_games(
+@router.post("/score/batch", response_model=List[GameScoreResponse])
+def score_game_performance_batch(
+    score_requests: List[GameScoreRequest],
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all available games with their configurations"""
-    games = db.query(Game).all()
-
-    return {
-        "games": [
-            {
-                "id": game.id,
-                "code": game.code,
-                "title": game.title,
-                "description": game.description,
-                "base_config": game.base_config
-            } for game in games
-        ],
-        "total": len(games)
+    """Score several game performances in one request and one transaction"""
+    if not score_requests:
+        raise HTTPException(status_code=400, detail="No scores provided")
+    if len(score_requests) > MAX_SCORE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SCORE_BATCH} scores per batch")
+
+    item_ids = [r.assessment_item_id for r in score_requests]
+    if len(set(item_ids)) != len(item_ids):
+        raise HTTPException(status_code=400, detail="Duplicate assessment item in batch")
+
+    # Every item with its game code and owning candidate in one query
+    rows = {
+        item.id: (item, game_code, candidate_id)
+        for item, game_code, candidate_id in db.query(AssessmentItem, Game.code, Assessment.candidate_id)
+            .outerjoin(Game, Game.id == AssessmentItem.game_id)
+            .outerjoin(Assessment, Assessment.id == AssessmentItem.assessment_id)
+            .filter(AssessmentItem.id.in_(item_ids))
     }
 
-@router.get("/by-code/{game_code}")
-async def get_game_by_code(
-    game_code: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get game by code (useful for frontend)"""
-    game = db.query(Game).filter(Game.code == game_code).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    # Validate the whole batch before writing anything
+    for item_id in item_ids:
+        if item_id not in rows:
+            raise HTTPException(status_code=404, detail=f"Assessment item not found: {item_id}")
+        _, game_code, candidate_id = rows[item_id]
+        if game_code is None:
+            raise HTTPException(status_code=404, detail="Game not found")
+        if current_user.role == "CANDIDATE" and candidate_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Access denied")
+        if game_code not in GAME_SCORING_FUNCTIONS:
+            raise HTTPException(status_code=400, detail=f"No scoring function available for game {game_code}")
+
+    results = []
+    for score_request in score_requests:
+        item, game_code, _ = rows[score_request.assessment_item_id]
+        score_response = GAME_SCORING_FUNCTIONS[game_code](score_request.raw_metrics)
+        _record_score(item, score_request.raw_metrics, score_response)
+        results.append(score_response)
 
-    return {
-        "id": game.id,
-        "code": game.code,
-        "title": game.title,
-        "description": game.description,
-        "base_config": game.base_config
-    }
\ No newline at end of file
+    db.commit()
+
+    return results
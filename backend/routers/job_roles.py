@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import case, exists, func, select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
-import uuid
 from database import get_db
-from models import JobRole, User, Tenant, Game, Assessment
-from routers.auth import get_current_admin_user, log_audit_action
+from models import JobRole, User, Game, Assessment, generate_id, utcnow
+from routers.auth import get_current_admin_user, get_default_tenant_id, log_audit_action
 
 router = APIRouter()
 
@@ -100,16 +100,7 @@ async def create_job_role(
     db: Session = Depends(get_db)
 ):
     # Get tenant
-    tenant = db.query(Tenant).first()
-    if not tenant:
-        tenant = Tenant(
-            id=str(uuid.uuid4()),
-            name="Default Tenant",
-            subdomain="default"
-        )
-        db.add(tenant)
-        db.commit()
-        db.refresh(tenant)
+    tenant_id = get_default_tenant_id(db)
 
     # AI-powered trait analysis if not provided
     traits_json = job_role_data.traits_json
@@ -118,17 +109,17 @@ async def create_job_role(
 
     # Create job role
     db_job_role = JobRole(
-        id=str(uuid.uuid4()),
-        tenant_id=tenant.id,
+        id=generate_id(),
+        tenant_id=tenant_id,
         title=job_role_data.title,
         description=job_role_data.description,
         traits_json=traits_json,
-        config_json=job_role_data.config_json or {}
+        config_json=job_role_data.config_json or {},
+        created_at=utcnow()
     )
 
+    # Every response field is set client-side, so no refresh SELECT is needed
     db.add(db_job_role)
-    db.commit()
-    db.refresh(db_job_role)
 
     # Log creation
     log_audit_action(
@@ -139,6 +130,7 @@ async def create_job_role(
         db_job_role.id,
         {"title": job_role_data.title}
     )
+    db.commit()
 
     return {
         "id": db_job_role.id,
@@ -212,9 +204,6 @@ async def update_job_role(
     if job_role_data.config_json:
         job_role.config_json = job_role_data.config_json
 
-    db.commit()
-    db.refresh(job_role)
-
     # Log update
     log_audit_action(
         db,
@@ -224,6 +213,7 @@ async def update_job_role(
         job_role_id,
         {"title": job_role.title}
     )
+    db.commit()
 
     return {
         "id": job_role.id,
@@ -244,9 +234,13 @@ async def delete_job_role(
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
 
-    # Check if job role is being used in assessments
-    assessment_count = db.query(Assessment).filter(Assessment.job_role_id == job_role_id).count()
-    if assessment_count > 0:
+    # Check if job role is being used in assessments; EXISTS stops at the first row,
+    # the full count is only taken for the error message
+    in_use = db.execute(
+        select(case((exists().where(Assessment.job_role_id == job_role_id), 1), else_=0))
+    ).scalar()
+    if in_use:
+        assessment_count = db.query(func.count(Assessment.id)).filter(Assessment.job_role_id == job_role_id).scalar()
         raise HTTPException(
             status_code=400,
             detail=f"Cannot delete job role: {assessment_count} assessments are using it"
@@ -281,8 +275,6 @@ async def analyze_job_role(
     traits_json = analyze_job_description_ai(job_role.description)
     job_role.traits_json = traits_json
 
-    db.commit()
-
     # Log analysis
     log_audit_action(
         db,
@@ -292,6 +284,7 @@ async def analyze_job_role(
         job_role_id,
         {"traits_count": len(traits_json)}
     )
+    db.commit()
 
     return {
         "message": "Job role analyzed successfully",
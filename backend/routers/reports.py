@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime
 from database import get_db
-from models import User, Assessment, AssessmentItem, Report, JobRole, CandidateProfile
+from models import User, Assessment, AssessmentItem, Report, JobRole, Game, generate_id, utcnow
 from routers.auth import get_current_admin_user, get_current_user, log_audit_action
 
 router = APIRouter()
@@ -60,15 +60,13 @@ async def generate_assessment_report(
 
     # Create report record
     db_report = Report(
-        id=str(uuid.uuid4()),
+        id=generate_id(),
         assessment_id=assessment.id,
         storage_key=storage_key,
-        created_at=datetime.utcnow()
+        created_at=utcnow()
     )
 
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
 
     # Log report generation
     log_audit_action(
@@ -82,6 +80,7 @@ async def generate_assessment_report(
             "include_raw_data": request.include_raw_data
         }
     )
+    db.commit()
 
     return {
         "id": db_report.id,
@@ -195,22 +194,29 @@ async def get_analytics_overview(
 
     average_completion_time = sum(completion_times) / len(completion_times) if completion_times else 0
 
+    # Items of every completed assessment in one query, with their game code joined in
+    completed_ids = query.filter(Assessment.status == "COMPLETED").with_entities(Assessment.id)
+    item_rows = (
+        db.query(AssessmentItem, Game.code)
+        .outerjoin(Game, Game.id == AssessmentItem.game_id)
+        .filter(AssessmentItem.assessment_id.in_(completed_ids.scalar_subquery()))
+        .all()
+    )
+
     # Trait averages
     trait_scores = {}
     trait_counts = {}
 
-    for assessment in completed_assessments:
-        items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment.id).all()
-        for item in items:
-            if item.metrics_json and "server_scoring" in item.metrics_json:
-                server_scoring = item.metrics_json["server_scoring"]
-                if "trait_scores" in server_scoring:
-                    for trait, score in server_scoring["trait_scores"].items():
-                        if trait not in trait_scores:
-                            trait_scores[trait] = 0
-                            trait_counts[trait] = 0
-                        trait_scores[trait] += score
-                        trait_counts[trait] += 1
+    for item, _ in item_rows:
+        if item.metrics_json and "server_scoring" in item.metrics_json:
+            server_scoring = item.metrics_json["server_scoring"]
+            if "trait_scores" in server_scoring:
+                for trait, score in server_scoring["trait_scores"].items():
+                    if trait not in trait_scores:
+                        trait_scores[trait] = 0
+                        trait_counts[trait] = 0
+                    trait_scores[trait] += score
+                    trait_counts[trait] += 1
 
     trait_averages = {}
     for trait in trait_scores:
@@ -218,23 +224,19 @@ async def get_analytics_overview(
 
     # Game performance
     game_performance = {}
-    for assessment in completed_assessments:
-        items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment.id).all()
-        for item in items:
-            game_code = "Unknown"
-            if item.game:
-                game_code = item.game.code
-
-            if game_code not in game_performance:
-                game_performance[game_code] = {
-                    "total_attempts": 0,
-                    "average_score": 0,
-                    "total_score": 0
-                }
-
-            game_performance[game_code]["total_attempts"] += 1
-            if item.score:
-                game_performance[game_code]["total_score"] += item.score
+    for item, code in item_rows:
+        game_code = code or "Unknown"
+
+        if game_code not in game_performance:
+            game_performance[game_code] = {
+                "total_attempts": 0,
+                "average_score": 0,
+                "total_score": 0
+            }
+
+        game_performance[game_code]["total_attempts"] += 1
+        if item.score:
+            game_performance[game_code]["total_score"] += item.score
 
     for game_code in game_performance:
         if game_performance[game_code]["total_attempts"] > 0:
@@ -296,11 +298,16 @@ async def get_candidate_analytics(
         } for a in sorted(completed_assessments, key=lambda x: x.completed_at or x.created_at)
     ]
 
+    # Fetch items for all completed assessments with one IN query, grouped per assessment
+    items_by_assessment = {}
+    completed_ids = [a.id for a in completed_assessments]
+    for item in db.query(AssessmentItem).filter(AssessmentItem.assessment_id.in_(completed_ids)).all():
+        items_by_assessment.setdefault(item.assessment_id, []).append(item)
+
     # Trait improvement analysis
     trait_improvement = {}
     for assessment in sorted(completed_assessments, key=lambda x: x.completed_at or x.created_at):
-        items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment.id).all()
-        for item in items:
+        for item in items_by_assessment.get(assessment.id, []):
             if item.metrics_json and "server_scoring" in item.metrics_json:
                 server_scoring = item.metrics_json["server_scoring"]
                 if "trait_scores" in server_scoring:
@@ -326,9 +333,11 @@ async def get_candidate_analytics(
 async def _generate_report_data(assessment: Assessment, report_type: str, include_raw_data: bool, db: Session):
     """Generate comprehensive report data"""
 
-    # Get candidate info
-    candidate = db.query(User).filter(User.id == assessment.candidate_id).first()
-    candidate_profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == candidate.id).first() if candidate else None
+    # Get candidate info; the profile comes back joined onto the same row
+    candidate = db.query(User).options(
+        joinedload(User.candidate_profile)
+    ).filter(User.id == assessment.candidate_id).first()
+    candidate_profile = candidate.candidate_profile if candidate else None
 
     # Get job role info
     job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
@@ -340,7 +349,7 @@ async def _generate_report_data(assessment: Assessment, report_type: str, includ
     report_data = {
         "report_metadata": {
             "assessment_id": assessment.id,
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": utcnow().isoformat(),
             "report_type": report_type,
             "candidate_id": assessment.candidate_id
         },
@@ -2,11 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from database import get_db
-from models import User, Assessment, AssessmentItem, AuditLog
+from models import User, Assessment, AssessmentItem, AuditLog, generate_id, utcnow
 from routers.auth import get_current_user, get_current_admin_user, log_audit_action
+from audit_queue import enqueue_audit_row
 
 router = APIRouter()
 
@@ -65,8 +65,9 @@ async def record_telemetry_event(
         raise HTTPException(status_code=403, detail="Access denied")
 
     # Create audit log entry for telemetry
+    now = utcnow()
     log_entry = AuditLog(
-        id=str(uuid.uuid4()),
+        id=generate_id(),
         tenant_id=assessment.tenant_id,
         actor_user_id=current_user.id,
         action=f"TELEMETRY_{event.event_type}",
@@ -80,7 +81,7 @@ async def record_telemetry_event(
             "data": event.data,
             "client_info": event.client_info
         },
-        created_at=datetime.utcnow()
+        created_at=now
     )
 
     db.add(log_entry)
@@ -94,7 +95,7 @@ async def record_telemetry_event(
         flag_list = current_flags.get("flags", [])
         flag_list.append(integrity_flag.dict())
         current_flags["flags"] = flag_list
-        current_flags["last_updated"] = datetime.utcnow().isoformat()
+        current_flags["last_updated"] = now.isoformat()
         assessment.integrity_flags = current_flags
 
     db.commit()
@@ -123,11 +124,9 @@ async def flag_integrity_violation(
     flag_list = current_flags.get("flags", [])
     flag_list.append(flag.dict())
     current_flags["flags"] = flag_list
-    current_flags["last_updated"] = datetime.utcnow().isoformat()
+    current_flags["last_updated"] = utcnow().isoformat()
     assessment.integrity_flags = current_flags
 
-    db.commit()
-
     # Log the manual flag
     log_audit_action(
         db,
@@ -141,6 +140,7 @@ async def flag_integrity_violation(
             "description": flag.description
         }
     )
+    db.commit()
 
     return {"message": "Integrity flag recorded successfully"}
 
@@ -244,25 +244,23 @@ async def record_heartbeat(
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Create heartbeat log
-    log_entry = AuditLog(
-        id=str(uuid.uuid4()),
-        tenant_id=assessment.tenant_id,
-        actor_user_id=current_user.id,
-        action="ASSESSMENT_HEARTBEAT",
-        target_type="ASSESSMENT",
-        target_id=assessment_id,
-        payload_json={
+    # Heartbeats are only aggregated later, so they go through the batched audit writer
+    recorded_at = utcnow()
+    await enqueue_audit_row(db, {
+        "id": generate_id(),
+        "tenant_id": assessment.tenant_id,
+        "actor_user_id": current_user.id,
+        "action": "ASSESSMENT_HEARTBEAT",
+        "target_type": "ASSESSMENT",
+        "target_id": assessment_id,
+        "payload_json": {
             "heartbeat_data": heartbeat_data,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": recorded_at.isoformat()
         },
-        created_at=datetime.utcnow()
-    )
-
-    db.add(log_entry)
-    db.commit()
+        "created_at": recorded_at
+    })
 
-    return {"status": "heartbeat recorded", "timestamp": log_entry.created_at.isoformat()}
+    return {"status": "heartbeat recorded", "timestamp": recorded_at.isoformat()}
 
 async def _check_integrity_violation(event: TelemetryEvent, assessment: Assessment, db: Session) -> Optional[IntegrityFlag]:
     """Check if a telemetry event indicates an integrity violation"""
@@ -277,7 +275,7 @@ async def _check_integrity_violation(event: TelemetryEvent, assessment: Assessme
     recent_events = db.query(AuditLog).filter(
         AuditLog.target_id == event.assessment_id,
         AuditLog.action == f"TELEMETRY_{event_type}",
-        AuditLog.created_at >= datetime.utcnow() - timedelta(minutes=30)  # Last 30 minutes
+        AuditLog.created_at >= utcnow() - timedelta(minutes=30)  # Last 30 minutes
     ).count()
 
     if recent_events >= threshold["threshold"]:
@@ -286,7 +284,7 @@ async def _check_integrity_violation(event: TelemetryEvent, assessment: Assessme
             flag_type=event_type,
             severity=threshold["severity"],
             description=f"Excessive {event_type.lower().replace('_', ' ')} events detected ({recent_events} in last 30 minutes)",
-            timestamp=datetime.utcnow(),
+            timestamp=utcnow(),
             evidence={
                 "event_count": recent_events,
                 "threshold": threshold["threshold"],
@@ -334,6 +332,6 @@ async def get_telemetry_stats(
         "integrity_flags": assessment.integrity_flags,
         "time_range": {
             "start": assessment.started_at.isoformat() if assessment.started_at else None,
-            "end": assessment.completed_at.isoformat() if assessment.completed_at else datetime.utcnow().isoformat()
+            "end": assessment.completed_at.isoformat() if assessment.completed_at else utcnow().isoformat()
         }
     }
\ No newline at end of file
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
-import uuid
 from database import get_db
-from models import User, Tenant
-from routers.auth import get_current_admin_user, log_audit_action
-from routers.auth import get_password_hash
+from pagination import NEXT_CURSOR_HEADER, keyset_page
+from models import USER_ROLES, User, generate_id, utcnow
+from routers.auth import get_current_admin_user, get_default_tenant_id, log_audit_action, invalidate_cached_user
+from routers.auth import invalidate_user_list_cache
+from routers.auth import Principal, get_current_admin_principal
+from routers.auth import conflicting_user_field, get_password_hash_async
 
 router = APIRouter()
 
@@ -44,45 +48,26 @@ async def create_user(
     db: Session = Depends(get_db)
 ):
     # Validate role
-    if user_data.role not in ["ADMIN", "CANDIDATE"]:
+    if user_data.role not in USER_ROLES:
         raise HTTPException(status_code=400, detail="Invalid role. Must be ADMIN or CANDIDATE")
 
-    # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
-        raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Check if username already exists
-    existing_username = db.query(User).filter(User.username == user_data.username).first()
-    if existing_username:
-        raise HTTPException(status_code=400, detail="Username already taken")
-
     # Get tenant
-    tenant = db.query(Tenant).first()
-    if not tenant:
-        tenant = Tenant(
-            id=str(uuid.uuid4()),
-            name="Default Tenant",
-            subdomain="default"
-        )
-        db.add(tenant)
-        db.commit()
-        db.refresh(tenant)
+    tenant_id = get_default_tenant_id(db)
 
     # Create user
     db_user = User(
-        id=str(uuid.uuid4()),
-        tenant_id=tenant.id,
+        id=generate_id(),
+        tenant_id=tenant_id,
         email=user_data.email,
         username=user_data.username,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
         role=user_data.role,
-        is_active=user_data.is_active
+        is_active=user_data.is_active,
+        created_at=utcnow()
     )
 
+    # Every response field is set client-side, so no refresh SELECT is needed
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
 
     # Log creation
     log_audit_action(
@@ -93,6 +78,18 @@ async def create_user(
         db_user.id,
         {"email": user_data.email, "role": user_data.role}
     )
+    # The unique constraints on username/email do the duplicate check in the INSERT itself
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        conflict = conflicting_user_field(db, user_data.username, user_data.email)
+        if conflict == "username":
+            raise HTTPException(status_code=400, detail="Username already taken")
+        if conflict == "email":
+            raise HTTPException(status_code=400, detail="Email already registered")
+        raise
+    invalidate_user_list_cache()
 
     return {
         "id": db_user.id,
@@ -106,19 +103,23 @@ async def create_user(
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = None,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_principal),
     db: Session = Depends(get_db)
 ):
-    # Build query
-    query = db.query(User)
+    # Project only the response columns; no password hashes or ORM entities per row
+    query = db.query(
+        User.id, User.email, User.username, User.role, User.is_active, User.created_at, User.last_login_at
+    )
 
     if role:
-        if role not in ["ADMIN", "CANDIDATE"]:
+        if role not in USER_ROLES:
             raise HTTPException(status_code=400, detail="Invalid role filter")
         query = query.filter(User.role == role)
 
@@ -132,7 +133,10 @@ async def get_users(
             (User.username.ilike(search_term))
         )
 
-    users = query.offset(skip).limit(limit).all()
+    # Keyset pagination on (created_at, id); skip is only honoured without a cursor
+    users, next_cursor = keyset_page(query, User.created_at, User.id, limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     return [
         {
@@ -149,7 +153,7 @@ async def get_users(
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_principal),
     db: Session = Depends(get_db)
 ):
     user = db.query(User).filter(User.id == user_id).first()
@@ -178,19 +182,17 @@ async def update_user(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Validate role if provided
-    if user_data.role and user_data.role not in ["ADMIN", "CANDIDATE"]:
+    if user_data.role and user_data.role not in USER_ROLES:
         raise HTTPException(status_code=400, detail="Invalid role. Must be ADMIN or CANDIDATE")
 
     # Check email uniqueness if changing
     if user_data.email and user_data.email != user.email:
-        existing = db.query(User).filter(User.email == user_data.email, User.id != user_id).first()
-        if existing:
+        if db.query(User.id).filter(User.email == user_data.email, User.id != user_id).first():
             raise HTTPException(status_code=400, detail="Email already in use")
 
     # Check username uniqueness if changing
     if user_data.username and user_data.username != user.username:
-        existing = db.query(User).filter(User.username == user_data.username, User.id != user_id).first()
-        if existing:
+        if db.query(User.id).filter(User.username == user_data.username, User.id != user_id).first():
             raise HTTPException(status_code=400, detail="Username already taken")
 
     # Update fields
@@ -203,9 +205,6 @@ async def update_user(
     if user_data.is_active is not None:
         user.is_active = user_data.is_active
 
-    db.commit()
-    db.refresh(user)
-
     # Log update
     log_audit_action(
         db,
@@ -220,6 +219,8 @@ async def update_user(
             "is_active": user_data.is_active
         }
     )
+    db.commit()
+    invalidate_cached_user(user_id)
 
     return {
         "id": user.id,
@@ -257,6 +258,7 @@ async def delete_user(
 
     db.delete(user)
     db.commit()
+    invalidate_cached_user(user_id)
 
     return {"message": "User deleted successfully"}
 
@@ -278,8 +280,7 @@ async def change_user_password(
         pass
 
     # Update password
-    user.password_hash = get_password_hash(password_data.new_password)
-    db.commit()
+    user.password_hash = await get_password_hash_async(password_data.new_password)
 
     # Log password change
     log_audit_action(
@@ -290,6 +291,8 @@ async def change_user_password(
         user_id,
         {"changed_by": current_user.id}
     )
+    db.commit()
+    invalidate_cached_user(user_id)
 
     return {"message": "Password changed successfully"}
 
@@ -308,7 +311,6 @@ async def deactivate_user(
         raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
 
     user.is_active = False
-    db.commit()
 
     # Log deactivation
     log_audit_action(
@@ -319,6 +321,8 @@ async def deactivate_user(
         user_id,
         {"email": user.email}
     )
+    db.commit()
+    invalidate_cached_user(user_id)
 
     return {"message": "User deactivated successfully"}
 
@@ -333,7 +337,6 @@ async def activate_user(
         raise HTTPException(status_code=404, detail="User not found")
 
     user.is_active = True
-    db.commit()
 
     # Log activation
     log_audit_action(
@@ -344,24 +347,31 @@ async def activate_user(
         user_id,
         {"email": user.email}
     )
+    db.commit()
+    invalidate_cached_user(user_id)
 
     return {"message": "User activated successfully"}
 
 @router.get("/stats/summary")
 async def get_user_stats(
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_principal),
     db: Session = Depends(get_db)
 ):
     """Get user statistics summary"""
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    admin_users = db.query(User).filter(User.role == "ADMIN").count()
-    candidate_users = db.query(User).filter(User.role == "CANDIDATE").count()
+    # One pass over users with conditional sums instead of four COUNT queries
+    stats = db.query(
+        func.count(User.id).label("total"),
+        func.sum(case((User.is_active == True, 1), else_=0)).label("active"),
+        func.sum(case((User.role == "ADMIN", 1), else_=0)).label("admins"),
+        func.sum(case((User.role == "CANDIDATE", 1), else_=0)).label("candidates")
+    ).one()
+    total_users = stats.total
+    active_users = stats.active or 0
 
     return {
         "total_users": total_users,
         "active_users": active_users,
         "inactive_users": total_users - active_users,
-        "admin_users": admin_users,
-        "candidate_users": candidate_users
+        "admin_users": stats.admins or 0,
+        "candidate_users": stats.candidates or 0
     }
\ No newline at end of file